@@ -4,11 +4,30 @@ Uses environment variables for sensitive data
 """
 import os
 import json
+import functools
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (set AEON_SKIP_DOTENV=1 to skip)
+if os.getenv('AEON_SKIP_DOTENV') != '1':
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+@functools.lru_cache(maxsize=None)
+def _prepare_dir(dir_path: str) -> str:
+    """Create a directory once per process and return it as str"""
+    path = Path(dir_path)
+    path.mkdir(parents=True, exist_ok=True)
+    return str(path)
+
+
+@functools.lru_cache(maxsize=None)
+def _prepare_file_path(file_path: str) -> str:
+    """Create a file's parent directory once per process and return the path as str"""
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return str(path)
+
 
 class Config:
     """
@@ -52,6 +71,11 @@ class Config:
         '/home/superral/aeon_nexus/data/aeon.db'
     )
     DATABASE_TIMEOUT = int(os.getenv('DATABASE_TIMEOUT', '30'))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '16'))  # Idle pooled connections per process
+    # Seconds between wal_checkpoint(TRUNCATE) runs (0 disables the timer)
+    WAL_CHECKPOINT_INTERVAL = int(os.getenv('WAL_CHECKPOINT_INTERVAL', '600'))
+    # Seconds a /health database probe result is reused (0 probes every request)
+    HEALTH_CHECK_TTL = float(os.getenv('HEALTH_CHECK_TTL', '1'))
     
     # ═══════════════════════════════════════════════════════════════
     # RATE LIMITING
@@ -64,6 +88,10 @@ class Config:
     RATE_LIMIT_CLEANUP_INTERVAL = int(
         os.getenv('RATE_LIMIT_CLEANUP_INTERVAL', '3600')
     )
+    # Send X-RateLimit-* headers on successful responses (429s always have them)
+    RATE_LIMIT_HEADERS = os.getenv('RATE_LIMIT_HEADERS', 'True').lower() == 'true'
+    # Rate limit by X-Forwarded-For; only enable behind a proxy that sets it
+    RATE_LIMIT_TRUST_PROXY = os.getenv('RATE_LIMIT_TRUST_PROXY', 'False').lower() == 'true'
     
     # Rate limit thresholds
     RATE_LIMIT_PROPOSAL_HOUR = int(os.getenv('RATE_LIMIT_PROPOSAL_HOUR', '10'))
@@ -97,6 +125,13 @@ class Config:
         os.getenv('MAX_PROPOSAL_CONTENT_SIZE', '10240')
     )  # 10KB
     
+    # (title, description, content) limits, in validation order
+    PROPOSAL_LIMITS = (
+        MAX_PROPOSAL_TITLE_LENGTH,
+        MAX_PROPOSAL_DESCRIPTION_LENGTH,
+        MAX_PROPOSAL_CONTENT_SIZE
+    )
+    
     # ═══════════════════════════════════════════════════════════════
     # LOGGING
     # ═══════════════════════════════════════════════════════════════
@@ -122,17 +157,13 @@ class Config:
     
     @classmethod
     def get_rate_limit_dir(cls):
-        """Get rate limit storage directory, create if not exists"""
-        path = Path(cls.RATE_LIMIT_STORAGE_DIR)
-        path.mkdir(parents=True, exist_ok=True)
-        return str(path)
+        """Get rate limit storage directory, create if not exists (once per process)"""
+        return _prepare_dir(cls.RATE_LIMIT_STORAGE_DIR)
     
     @classmethod
     def get_database_path(cls):
-        """Get database path, create directory if not exists"""
-        path = Path(cls.DATABASE_PATH)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        return str(path)
+        """Get database path, create directory if not exists (once per process)"""
+        return _prepare_file_path(cls.DATABASE_PATH)
     
     @classmethod
     def is_valid_node(cls, node_id: str) -> bool:
@@ -233,6 +264,9 @@ config_map = {
     'testing': TestingConfig
 }
 
+# Active configuration, resolved once from AEON_ENV at import time
+CONFIG = config_map.get(os.getenv('AEON_ENV', 'production').lower(), ProductionConfig)
+
 
 def get_config(env=None):
     """
@@ -240,13 +274,13 @@ def get_config(env=None):
     
     Args:
         env: Environment name ('development', 'production', 'testing')
-             If None, uses AEON_ENV environment variable
+             If None, returns the CONFIG resolved from AEON_ENV at import
     
     Returns:
         Config class appropriate for the environment
     """
     if env is None:
-        env = os.getenv('AEON_ENV', 'production')
+        return CONFIG
     
     return config_map.get(env.lower(), ProductionConfig)
 
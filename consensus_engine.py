@@ -21,20 +21,72 @@ import sqlite3
 import json
 import time
 import logging
+import atexit
 import sys
-import argparse
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+import heapq
+import functools
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
+from queue import Queue, SimpleQueue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 try:
-    import schedule
-except ImportError:
-    print("ERROR: 'schedule' library not found.")
-    print("Install with: pip install schedule")
-    sys.exit(1)
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used as fallback
+    orjson = None
+
+
+if orjson is not None:
+    def _dumps(obj) -> str:
+        """Serialize obj to a JSON str for TEXT columns"""
+        return orjson.dumps(obj).decode('utf-8')
+
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
+
+
+# QueueListener feeding the "consensus_engine" logger's handlers; replaced
+# (and the old one stopped) each time an engine configures the logger
+_log_listener: Optional[QueueListener] = None
+
+
+def _close_connections(write_conn: sqlite3.Connection, read_pool: Queue):
+    """Run PRAGMA optimize, then close an engine's writer and pooled readers"""
+    try:
+        write_conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    write_conn.close()
+    while not read_pool.empty():
+        read_pool.get_nowait().close()
+
+
+def _parse_content(content_json) -> Dict:
+    """Parse a proposal's content_json, returning {} if it is invalid or not an object"""
+    try:
+        content = _loads(content_json)
+    except (TypeError, ValueError):
+        return {}
+    return content if isinstance(content, dict) else {}
+
+
+# Per-connection settings applied once when a pooled connection is opened
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA wal_autocheckpoint = 1000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA foreign_keys = ON",
+)
 
 # =============================================================================
 # CONFIGURATION
@@ -45,6 +97,9 @@ class ConsensusConfig:
     
     # Database
     DB_PATH = "/home/superral/aeon_nexus/data/aeon.db"
+    SQLITE_POOL_SIZE = 4  # Reader connections (plus one writer)
+    SQLITE_CACHED_STATEMENTS = 256  # Prepared statements kept per connection
+    SCHEMA_VERSION = 1  # Stored in PRAGMA user_version once the schema is in place
     
     # Quorum settings
     QUORUM_PERCENTAGE = 0.67  # 67% FOR votes required
@@ -58,6 +113,8 @@ class ConsensusConfig:
     LOG_DIR = "/home/superral/aeon_nexus/logs"
     LOG_FILE = f"{LOG_DIR}/consensus.log"
     LOG_LEVEL = logging.INFO
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate consensus.log at 10MB
+    LOG_BACKUP_COUNT = 5
     
     # Archive settings
     ARCHIVE_AFTER_DAYS = 30  # Archive proposals after 30 days
@@ -106,9 +163,26 @@ class ProposalVoteResult:
     quorum_achieved: bool
     quorum_percentage: float
     required_percentage: float
+    content: Optional[Dict] = field(default=None, repr=False, compare=False)  # Parsed content_json
     
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {
+            'proposal_hash': self.proposal_hash,
+            'proposal_type': self.proposal_type,
+            'total_votes': self.total_votes,
+            'for_votes': self.for_votes,
+            'against_votes': self.against_votes,
+            'abstain_votes': self.abstain_votes,
+            'quorum_achieved': self.quorum_achieved,
+            'quorum_percentage': self.quorum_percentage,
+            'required_percentage': self.required_percentage
+        }
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes (orjson when installed)"""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict()).encode('utf-8')
     
     def __str__(self) -> str:
         return (
@@ -132,10 +206,87 @@ class ConsensusEngine:
         self.db_path = db_path or ConsensusConfig.DB_PATH
         self.quorum = quorum or ConsensusConfig.QUORUM_PERCENTAGE
         self.logger = self._setup_logger()
+        self._engine_id = f"consensus_engine_{self.logger.name.rsplit('.', 1)[-1]}"
+        
+        # Actions executed for accepted proposals, keyed by proposal type
+        self._handlers = {
+            ProposalType.NODE_ADMISSION.value: self._activate_node,
+            ProposalType.SYSTEM_UPDATE.value: self._execute_system_update,
+            ProposalType.PARAMETER_CHANGE.value: self._update_parameters,
+            ProposalType.SECURITY_UPDATE.value: functools.partial(
+                self._log_high_priority_action, action_type=ProposalType.SECURITY_UPDATE.value
+            ),
+            ProposalType.EMERGENCY.value: functools.partial(
+                self._log_high_priority_action, action_type=ProposalType.EMERGENCY.value
+            ),
+        }
+        
+        # One writer connection plus a pool of readers, opened once
+        self._write_lock = threading.Lock()
+        self._write_conn = self._init_conn()
+        self._read_pool: Queue = Queue()
+        for _ in range(ConsensusConfig.SQLITE_POOL_SIZE):
+            self._read_pool.put(self._init_conn())
+        # Closes the connections on close(), garbage collection or exit,
+        # without atexit keeping every engine alive
+        self._finalizer = weakref.finalize(
+            self, _close_connections, self._write_conn, self._read_pool
+        )
+        
         self._ensure_database_schema()
+    
+    def _init_conn(self) -> sqlite3.Connection:
+        """Open a connection with the engine's row factory and PRAGMAs applied"""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=ConsensusConfig.SQLITE_CACHED_STATEMENTS
+        )
+        conn.row_factory = sqlite3.Row
+        
+        # Try WAL mode, but fallback gracefully if it fails (permission issues)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError:
+            pass
+        
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _conn(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled connection
+        
+        write=True yields the single writer connection under a lock and
+        commits on success (rolls back on error). Otherwise a reader is
+        checked out of the pool for the duration of the block.
+        """
+        if write:
+            with self._write_lock, self._write_conn:
+                yield self._write_conn
+            return
+        
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+    
+    def close(self):
+        """Run PRAGMA optimize, then close the writer and all pooled readers"""
+        with self._write_lock:
+            self._finalizer()
         
     def _setup_logger(self) -> logging.Logger:
-        """Setup logger with file and console handlers"""
+        """
+        Setup logger with file and console handlers
+        
+        Records are enqueued by a QueueHandler and written to the file and
+        console handlers by a background QueueListener, so log calls on the
+        evaluation path never block on I/O.
+        """
         logger = logging.getLogger("consensus_engine")
         logger.setLevel(ConsensusConfig.LOG_LEVEL)
         
@@ -145,13 +296,16 @@ class ConsensusEngine:
         # Ensure log directory exists
         Path(ConsensusConfig.LOG_DIR).mkdir(parents=True, exist_ok=True)
         
-        # File handler
-        file_handler = logging.FileHandler(ConsensusConfig.LOG_FILE)
+        # File handler, rotated so the log cannot grow without bound
+        file_handler = RotatingFileHandler(
+            ConsensusConfig.LOG_FILE,
+            maxBytes=ConsensusConfig.LOG_MAX_BYTES,
+            backupCount=ConsensusConfig.LOG_BACKUP_COUNT
+        )
         file_formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
         
         # Console handler
         console_handler = logging.StreamHandler()
@@ -159,15 +313,31 @@ class ConsensusEngine:
             '%(levelname)s: %(message)s'
         )
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        
+        # Stop the listener of a previously configured engine, if any
+        global _log_listener
+        if _log_listener is not None:
+            atexit.unregister(_log_listener.stop)
+            _log_listener.stop()
+        
+        log_queue = SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        _log_listener = QueueListener(log_queue, file_handler, console_handler)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
         
         return logger
     
     def _ensure_database_schema(self):
         """Ensure database has all required tables and columns"""
+        # Healthy databases are already at the current version; skip the DDL
+        with self._conn() as conn:
+            user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if user_version >= ConsensusConfig.SCHEMA_VERSION:
+            return
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._conn(write=True) as conn:
                 cursor = conn.cursor()
                 
                 # Check if expires_at column exists
@@ -246,42 +416,76 @@ class ConsensusEngine:
                     )
                 """)
                 
+                # Partial indexes for the expired-proposal scan and archive sweep
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_proposals_open_expires
+                    ON aeon_collective_proposals(expires_at)
+                    WHERE status = 'VOTING_OPEN'
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_proposals_decided_created
+                    ON aeon_collective_proposals(created_at)
+                    WHERE status IN ('ACCEPTED', 'REJECTED')
+                """)
+                
+                # Covering index for vote aggregation per proposal
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_votes_proposal_vote
+                    ON aeon_collective_votes(proposal_hash, vote)
+                """)
+                
+                # Index for the decisions_last_24h statistic
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_consensus_log_event_ts
+                    ON aeon_consensus_log(event_type, timestamp)
+                """)
+                
+                # Gather planner statistics once; PRAGMA optimize keeps them fresh
+                if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+                    cursor.execute("ANALYZE")
+                
+                cursor.execute(f"PRAGMA user_version = {ConsensusConfig.SCHEMA_VERSION:d}")
                 conn.commit()
                 
         except Exception as e:
-            self.logger.error(f"Database schema setup failed: {e}")
+            self.logger.error("Database schema setup failed: %s", e)
             raise
     
-    def get_expired_proposals(self) -> List[Dict]:
+    def get_expired_proposals(self) -> List[sqlite3.Row]:
         """
         Get all VOTING_OPEN proposals that have expired
         
+        Each row also carries its aggregated vote counts (total_votes,
+        for_votes, against_votes, abstain_votes), so the evaluation cycle
+        needs no per-proposal queries.
+        
         Returns:
-            List of proposal dictionaries
+            List of proposal rows (sqlite3.Row, indexable by column name)
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            now = int(time.time())
-            
-            cursor.execute("""
+        now = int(time.time())
+        
+        with self._conn() as conn:
+            return conn.execute("""
                 SELECT 
-                    proposal_hash,
-                    title,
-                    content_json,
-                    status,
-                    expires_at,
-                    created_at,
-                    proposer_id
-                FROM aeon_collective_proposals
-                WHERE status = 'VOTING_OPEN' 
-                AND expires_at IS NOT NULL
-                AND expires_at <= ?
-                ORDER BY expires_at ASC
-            """, (now,))
-            
-            return [dict(row) for row in cursor.fetchall()]
+                    p.proposal_hash,
+                    p.title,
+                    p.content_json,
+                    p.status,
+                    p.expires_at,
+                    p.created_at,
+                    p.proposer_id,
+                    COUNT(v.vote) AS total_votes,
+                    SUM(CASE WHEN v.vote = 'FOR' THEN 1 ELSE 0 END) AS for_votes,
+                    SUM(CASE WHEN v.vote = 'AGAINST' THEN 1 ELSE 0 END) AS against_votes,
+                    SUM(CASE WHEN v.vote = 'ABSTAIN' THEN 1 ELSE 0 END) AS abstain_votes
+                FROM aeon_collective_proposals p
+                LEFT JOIN aeon_collective_votes v ON v.proposal_hash = p.proposal_hash
+                WHERE p.status = 'VOTING_OPEN' 
+                AND p.expires_at IS NOT NULL
+                AND p.expires_at <= ?
+                GROUP BY p.proposal_hash
+                ORDER BY p.expires_at ASC
+            """, (now,)).fetchall()
     
     def calculate_vote_results(self, proposal_hash: str) -> Optional[ProposalVoteResult]:
         """
@@ -293,62 +497,65 @@ class ConsensusEngine:
         Returns:
             ProposalVoteResult or None if proposal doesn't exist
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Get proposal type
-            cursor.execute("""
-                SELECT content_json FROM aeon_collective_proposals 
-                WHERE proposal_hash = ?
-            """, (proposal_hash,))
-            
-            result = cursor.fetchone()
-            if not result:
-                return None
-            
-            try:
-                content = json.loads(result['content_json'])
-                proposal_type = content.get('type', content.get('action', 'UNKNOWN'))
-            except:
-                proposal_type = 'UNKNOWN'
-            
-            # Get vote counts
-            cursor.execute("""
+        with self._conn() as conn:
+            result = conn.execute("""
                 SELECT 
-                    vote,
-                    COUNT(*) as count
-                FROM aeon_collective_votes
-                WHERE proposal_hash = ?
-                GROUP BY vote
-            """, (proposal_hash,))
-            
-            votes = {row['vote']: row['count'] for row in cursor.fetchall()}
-            
-            total_votes = sum(votes.values())
-            for_votes = votes.get('FOR', 0)
-            against_votes = votes.get('AGAINST', 0)
-            abstain_votes = votes.get('ABSTAIN', 0)
-            
-            # Calculate quorum
-            quorum_achieved = False
-            quorum_percentage = 0.0
-            
-            if total_votes >= ConsensusConfig.MINIMUM_VOTES:
-                quorum_percentage = for_votes / total_votes if total_votes > 0 else 0
-                quorum_achieved = quorum_percentage >= self.quorum
+                    p.proposal_hash,
+                    p.content_json,
+                    COUNT(v.vote) AS total_votes,
+                    SUM(CASE WHEN v.vote = 'FOR' THEN 1 ELSE 0 END) AS for_votes,
+                    SUM(CASE WHEN v.vote = 'AGAINST' THEN 1 ELSE 0 END) AS against_votes,
+                    SUM(CASE WHEN v.vote = 'ABSTAIN' THEN 1 ELSE 0 END) AS abstain_votes
+                FROM aeon_collective_proposals p
+                LEFT JOIN aeon_collective_votes v ON v.proposal_hash = p.proposal_hash
+                WHERE p.proposal_hash = ?
+                GROUP BY p.proposal_hash
+            """, (proposal_hash,)).fetchone()
+        
+        if not result:
+            return None
+        
+        return self.calculate_vote_results_from_row(result)
+    
+    def calculate_vote_results_from_row(self, row) -> ProposalVoteResult:
+        """
+        Build voting results from a row carrying aggregated vote counts
+        
+        Args:
+            row: Mapping with proposal_hash, content_json, total_votes,
+                 for_votes, against_votes and abstain_votes
+                 (as returned by get_expired_proposals)
             
-            return ProposalVoteResult(
-                proposal_hash=proposal_hash,
-                proposal_type=proposal_type,
-                total_votes=total_votes,
-                for_votes=for_votes,
-                against_votes=against_votes,
-                abstain_votes=abstain_votes,
-                quorum_achieved=quorum_achieved,
-                quorum_percentage=quorum_percentage,
-                required_percentage=self.quorum
-            )
+        Returns:
+            ProposalVoteResult
+        """
+        content = _parse_content(row['content_json'])
+        proposal_type = content.get('type', content.get('action', 'UNKNOWN'))
+        
+        total_votes = row['total_votes']
+        for_votes = row['for_votes']
+        
+        # Calculate quorum
+        quorum_achieved = False
+        quorum_percentage = 0.0
+        
+        if total_votes >= ConsensusConfig.MINIMUM_VOTES:
+            quorum_percentage = for_votes / total_votes if total_votes > 0 else 0
+            quorum_achieved = quorum_percentage >= self.quorum
+        
+        return ProposalVoteResult(
+            # Interned: open proposals are re-read every cycle, so repeats share one str
+            proposal_hash=sys.intern(row['proposal_hash']),
+            proposal_type=proposal_type,
+            total_votes=total_votes,
+            for_votes=for_votes,
+            against_votes=row['against_votes'],
+            abstain_votes=row['abstain_votes'],
+            quorum_achieved=quorum_achieved,
+            quorum_percentage=quorum_percentage,
+            required_percentage=self.quorum,
+            content=content
+        )
     
     def execute_proposal_decision(self, proposal: Dict, vote_result: ProposalVoteResult) -> bool:
         """
@@ -364,85 +571,111 @@ class ConsensusEngine:
         Returns:
             True if decision was executed successfully
         """
+        return self.execute_proposal_decisions_batch([(proposal, vote_result)]) == 1
+    
+    def execute_proposal_decisions_batch(self, proposals_with_results: List[Tuple[Dict, ProposalVoteResult]]) -> int:
+        """
+        Execute decisions for several proposals in a single write transaction
+        
+        The write lock is taken up front (BEGIN IMMEDIATE). Each proposal is
+        claimed with an idempotent UPDATE ... RETURNING inside a savepoint:
+        proposals already evaluated by another engine return no row and are
+        skipped, and a failing action rolls the claim back so the proposal
+        stays open for the next cycle. Decision log rows are then written
+        with executemany and committed once.
+        
+        Args:
+            proposals_with_results: List of (proposal dictionary, voting results)
+            
+        Returns:
+            Number of decisions executed successfully
+        """
+        if not proposals_with_results:
+            return 0
+        
+        now = int(time.time())
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Parse proposal content
-                try:
-                    content = json.loads(proposal['content_json'])
-                except:
-                    content = {}
-                
-                proposal_type = content.get('type', content.get('action', 'UNKNOWN'))
-                
-                # Determine new status
-                new_status = ProposalStatus.ACCEPTED.value if vote_result.quorum_achieved else ProposalStatus.REJECTED.value
-                
-                # IDEMPOTENT UPDATE: Only update if status is still VOTING_OPEN
-                # This prevents duplicate execution if multiple engines run
-                cursor.execute("""
-                    UPDATE aeon_collective_proposals 
-                    SET status = ?,
-                        evaluated_by = ?,
-                        evaluated_at = ?
-                    WHERE proposal_hash = ? 
-                    AND status = 'VOTING_OPEN'
-                """, (new_status, f"consensus_engine_{self.logger.name.split('.')[-1]}", 
-                      int(time.time()), proposal['proposal_hash']))
-                
-                # Check if WE successfully updated it
-                if cursor.rowcount == 0:
-                    # Another engine already processed this - skip
-                    self.logger.debug(f"Proposal {proposal['proposal_hash'][:16]}... already evaluated by another instance")
-                    return False
+            with self._conn(write=True) as conn:
+                conn.execute("BEGIN IMMEDIATE")
                 
-                # We won the race - log and execute
-                self.logger.info(str(vote_result))
+                log_rows = []
                 
-                # Execute specific actions if accepted
-                if vote_result.quorum_achieved:
-                    if proposal_type == ProposalType.NODE_ADMISSION.value:
-                        success = self._activate_node(conn, proposal['proposal_hash'], content)
-                        if success:
-                            node_id = content.get('data', {}).get('node_id', content.get('node_id', 'UNKNOWN'))
-                            self.logger.info(f"✓ Node activated: {node_id}")
+                for proposal, vote_result in proposals_with_results:
+                    proposal_hash = proposal['proposal_hash']
                     
-                    elif proposal_type == ProposalType.SYSTEM_UPDATE.value:
-                        self._execute_system_update(conn, proposal['proposal_hash'], content)
+                    # Determine new status
+                    new_status = ProposalStatus.ACCEPTED.value if vote_result.quorum_achieved else ProposalStatus.REJECTED.value
                     
-                    elif proposal_type == ProposalType.PARAMETER_CHANGE.value:
-                        self._update_parameters(conn, proposal['proposal_hash'], content)
+                    conn.execute("SAVEPOINT proposal_decision")
                     
-                    elif proposal_type in [ProposalType.SECURITY_UPDATE.value, ProposalType.EMERGENCY.value]:
-                        self._log_high_priority_action(conn, proposal['proposal_hash'], proposal_type, content)
+                    # Claim and action share one try: any failure (e.g. a CHECK
+                    # constraint on the new status) only undoes this proposal
+                    try:
+                        # IDEMPOTENT UPDATE: Only update if status is still VOTING_OPEN
+                        # This prevents duplicate execution if multiple engines run
+                        winner = conn.execute("""
+                            UPDATE aeon_collective_proposals 
+                            SET status = ?,
+                                evaluated_by = ?,
+                                evaluated_at = ?
+                            WHERE proposal_hash = ? 
+                            AND status = 'VOTING_OPEN'
+                            RETURNING proposal_hash
+                        """, (new_status, self._engine_id, now, proposal_hash)).fetchone()
+                        
+                        if winner is None:
+                            # Another engine already processed this - skip
+                            conn.execute("RELEASE proposal_decision")
+                            self.logger.debug("Proposal %.16s... already evaluated by another instance", proposal_hash)
+                            continue
+                        
+                        # Reuse content parsed while calculating the vote result
+                        content = vote_result.content
+                        if content is None:
+                            content = _parse_content(proposal['content_json'])
+                        
+                        proposal_type = content.get('type', content.get('action', 'UNKNOWN'))
+                        
+                        # Execute specific actions if accepted
+                        if vote_result.quorum_achieved:
+                            handler = self._handlers.get(proposal_type)
+                            if handler:
+                                handler(conn, proposal_hash, content, now)
+                    except Exception:
+                        conn.execute("ROLLBACK TO proposal_decision")
+                        conn.execute("RELEASE proposal_decision")
+                        self.logger.exception("Failed to execute decision for %.16s...", proposal_hash)
+                        continue
+                    conn.execute("RELEASE proposal_decision")
+                    
+                    self.logger.info("%s", vote_result)
+                    
+                    log_rows.append((
+                        now,
+                        'PROPOSAL_DECIDED',
+                        proposal_hash,
+                        _dumps({
+                            'decision': new_status,
+                            'vote_result': vote_result.to_dict(),
+                            'evaluated_by': self._engine_id
+                        })
+                    ))
                 
-                # Log decision to consensus log
-                cursor.execute("""
+                # Log decisions to consensus log
+                conn.executemany("""
                     INSERT INTO aeon_consensus_log 
                     (timestamp, event_type, proposal_hash, details)
                     VALUES (?, ?, ?, ?)
-                """, (
-                    int(time.time()),
-                    'PROPOSAL_DECIDED',
-                    proposal['proposal_hash'],
-                    json.dumps({
-                        'decision': new_status,
-                        'vote_result': vote_result.to_dict(),
-                        'evaluated_by': f"consensus_engine_{self.logger.name.split('.')[-1]}"
-                    })
-                ))
+                """, log_rows)
                 
-                conn.commit()
-                return True
+                return len(log_rows)
                 
-        except Exception as e:
-            self.logger.error(f"Failed to execute decision for {proposal['proposal_hash'][:16]}...: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        except Exception:
+            self.logger.exception("Failed to execute decision batch")
+            return 0
     
-    def _activate_node(self, conn: sqlite3.Connection, proposal_hash: str, content: Dict) -> bool:
+    def _activate_node(self, conn: sqlite3.Connection, proposal_hash: str, content: Dict, now: int) -> bool:
         """
         Activate a node based on NODE_ADMISSION proposal
         
@@ -450,13 +683,12 @@ class ConsensusEngine:
             conn: Database connection
             proposal_hash: Hash of the admission proposal
             content: Proposal content
+            now: Timestamp of the evaluation cycle
             
         Returns:
             True if node was activated successfully
         """
         try:
-            cursor = conn.cursor()
-            
             # Extract node data (support both formats)
             node_data = content.get('data', content)
             node_id = node_data.get('node_id')
@@ -467,72 +699,60 @@ class ConsensusEngine:
                 self.logger.error("NODE_ADMISSION proposal missing node_id")
                 return False
             
-            # Check if node already exists
-            cursor.execute("""
-                SELECT status FROM aeon_nodes 
-                WHERE node_id = ? OR proposal_hash = ?
-            """, (node_id, proposal_hash))
-            
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing node
-                cursor.execute("""
-                    UPDATE aeon_nodes 
-                    SET status = 'ACTIVE',
-                        endpoint = ?,
-                        public_key = ?,
-                        updated_at = ?
-                    WHERE node_id = ? OR proposal_hash = ?
-                """, (
-                    endpoint,
-                    public_key,
-                    int(time.time()),
-                    node_id,
-                    proposal_hash
-                ))
-            else:
-                # Insert new node
-                cursor.execute("""
-                    INSERT INTO aeon_nodes 
-                    (node_id, endpoint, public_key, status, proposal_hash, created_at)
-                    VALUES (?, ?, ?, 'ACTIVE', ?, ?)
-                """, (
-                    node_id,
-                    endpoint,
-                    public_key,
-                    proposal_hash,
-                    int(time.time())
-                ))
+            # Insert or re-activate in one statement; a node may already exist
+            # under this node_id or under this admission proposal
+            conn.execute("""
+                INSERT INTO aeon_nodes 
+                (node_id, endpoint, public_key, status, proposal_hash, created_at, updated_at)
+                VALUES (?, ?, ?, 'ACTIVE', ?, ?, ?)
+                ON CONFLICT(node_id) DO UPDATE SET
+                    status = 'ACTIVE',
+                    endpoint = excluded.endpoint,
+                    public_key = excluded.public_key,
+                    updated_at = excluded.updated_at
+                ON CONFLICT(proposal_hash) DO UPDATE SET
+                    status = 'ACTIVE',
+                    endpoint = excluded.endpoint,
+                    public_key = excluded.public_key,
+                    updated_at = excluded.updated_at
+            """, (
+                node_id,
+                endpoint,
+                public_key,
+                proposal_hash,
+                now,
+                now
+            ))
             
             # Log the activation
-            cursor.execute("""
+            conn.execute("""
                 INSERT INTO aeon_consensus_log 
                 (timestamp, event_type, proposal_hash, node_id, details)
                 VALUES (?, 'NODE_ACTIVATION', ?, ?, ?)
             """, (
-                int(time.time()),
+                now,
                 proposal_hash,
                 node_id,
-                json.dumps({
+                _dumps({
                     "action": "node_activated",
                     "endpoint": endpoint,
                     "vote_result": "ACCEPTED"
                 })
             ))
             
+            self.logger.info("✓ Node activated: %s", node_id)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to activate node: {e}")
+            self.logger.error("Failed to activate node: %s", e)
             return False
     
-    def _execute_system_update(self, conn: sqlite3.Connection, proposal_hash: str, content: Dict):
+    def _execute_system_update(self, conn: sqlite3.Connection, proposal_hash: str, content: Dict, now: int):
         """Execute SYSTEM_UPDATE proposal actions"""
         update_data = content.get('data', content)
         description = update_data.get('description', update_data.get('rationale', 'System update'))
         
-        self.logger.info(f"✓ Executing system update: {description}")
+        self.logger.info("✓ Executing system update: %s", description)
         
         # Log the update
         cursor = conn.cursor()
@@ -541,12 +761,12 @@ class ConsensusEngine:
             (timestamp, event_type, proposal_hash, details)
             VALUES (?, 'SYSTEM_UPDATE', ?, ?)
         """, (
-            int(time.time()),
+            now,
             proposal_hash,
-            json.dumps(update_data)
+            _dumps(update_data)
         ))
     
-    def _update_parameters(self, conn: sqlite3.Connection, proposal_hash: str, content: Dict):
+    def _update_parameters(self, conn: sqlite3.Connection, proposal_hash: str, content: Dict, now: int):
         """Update system parameters"""
         params = content.get('data', content.get('parameters', {}))
         
@@ -555,17 +775,15 @@ class ConsensusEngine:
             return
         
         cursor = conn.cursor()
-        updated_count = 0
+        rows = [(key, _dumps(value), now) for key, value in params.items()]
         
-        for key, value in params.items():
-            cursor.execute("""
-                INSERT OR REPLACE INTO aeon_system_parameters 
-                (parameter_key, parameter_value, updated_at)
-                VALUES (?, ?, ?)
-            """, (key, json.dumps(value), int(time.time())))
-            updated_count += 1
+        cursor.executemany("""
+            INSERT OR REPLACE INTO aeon_system_parameters 
+            (parameter_key, parameter_value, updated_at)
+            VALUES (?, ?, ?)
+        """, rows)
         
-        self.logger.info(f"✓ Updated {updated_count} system parameter(s)")
+        self.logger.info("✓ Updated %d system parameter(s)", len(rows))
         
         # Log parameter change
         cursor.execute("""
@@ -573,15 +791,15 @@ class ConsensusEngine:
             (timestamp, event_type, proposal_hash, details)
             VALUES (?, 'PARAMETER_CHANGE', ?, ?)
         """, (
-            int(time.time()),
+            now,
             proposal_hash,
-            json.dumps({"parameters_updated": list(params.keys())})
+            _dumps({"parameters_updated": list(params.keys())})
         ))
     
     def _log_high_priority_action(self, conn: sqlite3.Connection, proposal_hash: str, 
-                                  action_type: str, content: Dict):
+                                  content: Dict, now: int, action_type: str):
         """Log high-priority actions (security updates, emergency actions)"""
-        self.logger.warning(f"⚠️  HIGH PRIORITY: {action_type} proposal accepted")
+        self.logger.warning("⚠️  HIGH PRIORITY: %s proposal accepted", action_type)
         
         cursor = conn.cursor()
         cursor.execute("""
@@ -589,10 +807,10 @@ class ConsensusEngine:
             (timestamp, event_type, proposal_hash, details)
             VALUES (?, ?, ?, ?)
         """, (
-            int(time.time()),
+            now,
             action_type,
             proposal_hash,
-            json.dumps(content)
+            _dumps(content)
         ))
     
     def run_evaluation_cycle(self) -> Tuple[int, int]:
@@ -610,86 +828,81 @@ class ConsensusEngine:
             self.logger.info("No expired proposals to evaluate")
             return 0, 0
         
-        self.logger.info(f"Found {len(expired_proposals)} expired proposal(s)")
+        self.logger.info("Found %d expired proposal(s)", len(expired_proposals))
         
-        successes = 0
+        decisions = []
         for proposal in expired_proposals:
             try:
-                # Calculate vote results
-                vote_result = self.calculate_vote_results(proposal['proposal_hash'])
-                
-                if not vote_result:
-                    self.logger.warning(f"Could not calculate votes for {proposal['proposal_hash'][:16]}...")
-                    continue
-                
-                # Execute decision
-                success = self.execute_proposal_decision(proposal, vote_result)
-                
-                if success:
-                    successes += 1
-                    
+                # Vote counts were aggregated by get_expired_proposals
+                decisions.append((proposal, self.calculate_vote_results_from_row(proposal)))
             except Exception as e:
-                self.logger.error(f"Error evaluating proposal {proposal['proposal_hash'][:16]}...: {e}")
+                self.logger.error("Error evaluating proposal %.16s...: %s", proposal['proposal_hash'], e)
+        
+        # Execute all decisions in one transaction
+        successes = self.execute_proposal_decisions_batch(decisions)
         
-        self.logger.info(f"Evaluation cycle completed: {successes}/{len(expired_proposals)} successful")
+        self.logger.info("Evaluation cycle completed: %d/%d successful", successes, len(expired_proposals))
         return len(expired_proposals), successes
     
     def run_cleanup(self):
         """Cleanup old data"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Archive old proposals (older than configured days)
-            archive_threshold = int(time.time()) - (ConsensusConfig.ARCHIVE_AFTER_DAYS * 24 * 3600)
-            
-            cursor.execute("""
+        # Archive old proposals (older than configured days)
+        archive_threshold = int(time.time()) - (ConsensusConfig.ARCHIVE_AFTER_DAYS * 24 * 3600)
+        
+        # Cheap check on a reader first, so idle ticks never open a write transaction
+        with self._conn() as conn:
+            pending = conn.execute("""
+                SELECT 1 FROM aeon_collective_proposals 
+                WHERE status IN ('ACCEPTED', 'REJECTED')
+                AND created_at < ?
+                LIMIT 1
+            """, (archive_threshold,)).fetchone()
+        
+        if pending is None:
+            return
+        
+        with self._conn(write=True) as conn:
+            archived = conn.execute("""
                 UPDATE aeon_collective_proposals 
                 SET status = 'ARCHIVED'
                 WHERE status IN ('ACCEPTED', 'REJECTED')
                 AND created_at < ?
-            """, (archive_threshold,))
+            """, (archive_threshold,)).rowcount
             
-            archived = cursor.rowcount
             if archived > 0:
-                self.logger.info(f"✓ Archived {archived} old proposal(s)")
-            
-            conn.commit()
+                self.logger.info("✓ Archived %d old proposal(s)", archived)
     
     def get_statistics(self) -> Dict:
         """Get consensus engine statistics"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            stats = {}
-            
-            # Proposal stats
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
+        with self._conn() as conn:
+            # Proposal stats, node stats and recent decisions in one round trip
+            rows = conn.execute("""
+                SELECT 'proposals' AS kind, status, COUNT(*) AS count 
                 FROM aeon_collective_proposals 
                 GROUP BY status
-            """)
-            stats['proposals_by_status'] = {row['status']: row['count'] for row in cursor.fetchall()}
-            
-            # Node stats
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
+                UNION ALL
+                SELECT 'nodes', status, COUNT(*) 
                 FROM aeon_nodes 
                 GROUP BY status
-            """)
-            stats['nodes_by_status'] = {row['status']: row['count'] for row in cursor.fetchall()}
-            
-            # Recent decisions
-            cursor.execute("""
-                SELECT COUNT(*) as count 
+                UNION ALL
+                SELECT 'decisions', NULL, COUNT(*) 
                 FROM aeon_consensus_log 
                 WHERE event_type = 'PROPOSAL_DECIDED'
                 AND timestamp > ?
-            """, (int(time.time()) - 86400,))  # Last 24 hours
-            result = cursor.fetchone()
-            stats['decisions_last_24h'] = result['count'] if result else 0
-            
-            return stats
+            """, (int(time.time()) - 86400,)).fetchall()  # Last 24 hours
+        
+        stats = {
+            'proposals_by_status': {},
+            'nodes_by_status': {},
+            'decisions_last_24h': 0
+        }
+        for row in rows:
+            if row['kind'] == 'decisions':
+                stats['decisions_last_24h'] = row['count']
+            else:
+                stats[f"{row['kind']}_by_status"][row['status']] = row['count']
+        
+        return stats
 
 # =============================================================================
 # SCHEDULER
@@ -701,6 +914,7 @@ class ConsensusScheduler:
     def __init__(self, engine: ConsensusEngine):
         self.engine = engine
         self.running = False
+        self._stop_event = threading.Event()
     
     def run_scheduled_check(self):
         """Run the evaluation cycle"""
@@ -709,56 +923,60 @@ class ConsensusScheduler:
             
             if proposals_evaluated > 0:
                 self.engine.logger.info(
-                    f"Scheduled check completed: "
-                    f"{successes}/{proposals_evaluated} proposal(s) processed"
+                    "Scheduled check completed: %d/%d proposal(s) processed",
+                    successes, proposals_evaluated
                 )
                 
-        except Exception as e:
-            self.engine.logger.error(f"Scheduled check failed: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            self.engine.logger.exception("Scheduled check failed")
     
     def run_cleanup_check(self):
         """Run cleanup task"""
         try:
             self.engine.run_cleanup()
         except Exception as e:
-            self.engine.logger.error(f"Cleanup failed: {e}")
+            self.engine.logger.error("Cleanup failed: %s", e)
     
     def start(self):
         """Start the scheduler"""
         self.running = True
+        self._stop_event.clear()
         self.engine.logger.info("✓ Consensus scheduler started")
         
-        # Schedule evaluation every minute
-        schedule.every(ConsensusConfig.CHECK_INTERVAL_MINUTES).minutes.do(
-            self.run_scheduled_check
-        )
+        check_interval = ConsensusConfig.CHECK_INTERVAL_MINUTES * 60
+        cleanup_interval = ConsensusConfig.CLEANUP_INTERVAL_HOURS * 3600
         
-        # Schedule cleanup daily
-        schedule.every(ConsensusConfig.CLEANUP_INTERVAL_HOURS).hours.do(
-            self.run_cleanup_check
-        )
+        # Min-heap of (next_run, tie_breaker, interval, job) on the monotonic clock
+        now = time.monotonic()
+        jobs = [
+            (now + check_interval, 0, check_interval, self.run_scheduled_check),  # Evaluation every minute
+            (now + cleanup_interval, 1, cleanup_interval, self.run_cleanup_check)  # Cleanup daily
+        ]
+        heapq.heapify(jobs)
         
         # Run immediately on startup
         self.run_scheduled_check()
         
-        # Keep running
+        # Keep running: sleep until the next job is due, or until stop() is called
         try:
             while self.running:
-                schedule.run_pending()
-                time.sleep(30)  # Check every 30 seconds
+                next_run, order, interval, job = jobs[0]
+                if self._stop_event.wait(max(0.0, next_run - time.monotonic())):
+                    break
+                job()
+                heapq.heapreplace(jobs, (time.monotonic() + interval, order, interval, job))
                 
         except KeyboardInterrupt:
             self.engine.logger.info("Consensus scheduler stopped by user")
         except Exception as e:
-            self.engine.logger.error(f"Scheduler error: {e}")
+            self.engine.logger.error("Scheduler error: %s", e)
         finally:
             self.stop()
     
     def stop(self):
-        """Stop the scheduler"""
+        """Stop the scheduler (wakes a sleeping start() loop immediately)"""
         self.running = False
+        self._stop_event.set()
         self.engine.logger.info("Consensus scheduler stopped")
 
 # =============================================================================
@@ -767,6 +985,8 @@ class ConsensusScheduler:
 
 def main():
     """Main entry point"""
+    import argparse  # only needed for CLI use, not when imported as a library
+    
     parser = argparse.ArgumentParser(
         description='AEON NEXUS Consensus Engine',
         formatter_class=argparse.RawDescriptionHelpFormatter,
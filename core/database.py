@@ -2,34 +2,311 @@ import sqlite3
 import threading
 import time
 import os
+import queue
+import atexit
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Optional
 from config import Config
 
 
+# Applied to every new connection; each one is optional (e.g. WAL can fail on
+# shared hosting without write access to the directory). The busy timeout
+# comes from sqlite3.connect(timeout=...)
+_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 MB
+    "PRAGMA mmap_size = 268435456",  # 256 MB
+    "PRAGMA wal_autocheckpoint = 1000",
+)
+
+
+def _tune(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply the standard PRAGMAs to a new connection, skipping any that fail."""
+    for pragma in _PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.OperationalError:
+            # Not permitted here (probably permissions), keep the default
+            pass
+    return conn
+
+
+# Ethical manifest columns, shared by the schema and its WITHOUT ROWID migration
+_MANIFEST_COLUMNS_SQL = """
+        version TEXT NOT NULL,
+        principle TEXT NOT NULL,
+        definition TEXT NOT NULL,
+        implementation TEXT,
+        last_updated INTEGER NOT NULL,
+        updated_by TEXT NOT NULL,
+        active INTEGER DEFAULT 1,
+        PRIMARY KEY (version, principle)
+"""
+
+# Schema script: all tables, run in one transaction (left open for the seed)
+_SCHEMA_SQL = f"""
+    BEGIN IMMEDIATE;
+
+    -- ---------------------------------------------------------
+    -- Hash chain (Audit Log)
+    -- ---------------------------------------------------------
+    CREATE TABLE IF NOT EXISTS aeon_log_chain (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id TEXT UNIQUE NOT NULL,
+        node_id TEXT NOT NULL,
+        operation TEXT NOT NULL,
+        payload_json TEXT NOT NULL,
+        previous_hash TEXT,
+        current_hash TEXT NOT NULL,
+        signature TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        state TEXT NOT NULL DEFAULT 'COMMITTED',
+        created_at INTEGER NOT NULL
+    );
+
+    -- ---------------------------------------------------------
+    -- Collective Memory
+    -- ---------------------------------------------------------
+    CREATE TABLE IF NOT EXISTS aeon_collective_memory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_hash TEXT UNIQUE NOT NULL,
+        timestamp INTEGER NOT NULL,
+        agent_id TEXT NOT NULL,
+        insight_type TEXT NOT NULL CHECK (
+            insight_type IN ('PROPOSAL','VOTE','MEMORY','DECISION','INSIGHT')
+        ),
+        content TEXT NOT NULL,
+        signature TEXT NOT NULL,
+        verified INTEGER DEFAULT 1,
+        indexed_at INTEGER NOT NULL
+    );
+
+    -- ---------------------------------------------------------
+    -- Proposals
+    -- ---------------------------------------------------------
+    CREATE TABLE IF NOT EXISTS aeon_collective_proposals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        proposal_hash TEXT UNIQUE NOT NULL,
+        proposer_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        content_json TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'VOTING_OPEN' CHECK (
+            status IN ('VOTING_OPEN','VOTING_CLOSED','PASSED','REJECTED','EXECUTED')
+        ),
+        created_at INTEGER NOT NULL,
+        expires_at INTEGER,
+        quorum_required REAL DEFAULT 0.67,
+        pass_threshold REAL DEFAULT 0.5,
+        executed_at INTEGER,
+        execution_result TEXT
+    );
+
+    -- ---------------------------------------------------------
+    -- Votes
+    -- ---------------------------------------------------------
+    CREATE TABLE IF NOT EXISTS aeon_collective_votes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        proposal_hash TEXT NOT NULL,
+        voter_id TEXT NOT NULL,
+        vote TEXT NOT NULL CHECK (
+            vote IN ('FOR','AGAINST','ABSTAIN')
+        ),
+        timestamp INTEGER NOT NULL,
+        signature TEXT NOT NULL,
+        UNIQUE(proposal_hash, voter_id),
+        FOREIGN KEY (proposal_hash) REFERENCES aeon_collective_proposals(proposal_hash) ON DELETE CASCADE
+    );
+
+    -- ---------------------------------------------------------
+    -- Ethical Manifest (clustered on its natural key)
+    -- ---------------------------------------------------------
+    CREATE TABLE IF NOT EXISTS aeon_ethical_manifest ({_MANIFEST_COLUMNS_SQL}) WITHOUT ROWID;
+"""
+
+# Rebuild a pre-WITHOUT ROWID aeon_ethical_manifest (id column + UNIQUE index)
+_MANIFEST_MIGRATION = (
+    f"CREATE TABLE aeon_ethical_manifest_new ({_MANIFEST_COLUMNS_SQL}) WITHOUT ROWID",
+    """
+    INSERT OR IGNORE INTO aeon_ethical_manifest_new
+    (version, principle, definition, implementation, last_updated, updated_by, active)
+    SELECT version, principle, definition, implementation, last_updated, updated_by, active
+    FROM aeon_ethical_manifest
+    """,
+    "DROP TABLE aeon_ethical_manifest",
+    "ALTER TABLE aeon_ethical_manifest_new RENAME TO aeon_ethical_manifest",
+)
+
+# Index script, run after the seed rows are in place
+_INDEX_SQL = """
+    BEGIN IMMEDIATE;
+    CREATE INDEX IF NOT EXISTS idx_log_chain_entry ON aeon_log_chain(entry_id);
+    CREATE INDEX IF NOT EXISTS idx_log_chain_timestamp ON aeon_log_chain(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_log_chain_node_ts ON aeon_log_chain(node_id, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_mem_agent_ts ON aeon_collective_memory(agent_id, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_memory_timestamp ON aeon_collective_memory(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_proposals_status_created ON aeon_collective_proposals(status, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_votes_proposal_vote ON aeon_collective_votes(proposal_hash, vote);
+    -- Superseded by the composite indexes above
+    DROP INDEX IF EXISTS idx_proposals_status;
+    DROP INDEX IF EXISTS idx_votes_proposal;
+    DROP INDEX IF EXISTS idx_memory_agent;
+    -- Expiry scans use the consensus engine's partial idx_proposals_open_expires
+    DROP INDEX IF EXISTS idx_proposals_status_expires;
+    COMMIT;
+"""
+
+# INSERT OR IGNORE skips principles that already exist
+_SEED_SQL = """
+    INSERT OR IGNORE INTO aeon_ethical_manifest
+    (version, principle, definition, implementation, last_updated, updated_by)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to the pool it came from."""
+
+    _pool: Optional[queue.Queue] = None
+    _in_pool = False
+
+    def close(self):
+        if self._pool is None:
+            super().close()
+            return
+        if self._in_pool:
+            # Already returned; a second close() must not pool it twice
+            return
+        try:
+            if self.in_transaction:
+                # Closing discards uncommitted work, keep that behaviour
+                self.rollback()
+            self.row_factory = sqlite3.Row
+            self._in_pool = True
+            self._pool.put_nowait(self)
+        except (queue.Full, sqlite3.Error):
+            self._pool = None
+            super().close()
+
+
 class DatabaseManager:
     """Thread-safe database management med connection pooling og ÆON Nexus skema."""
 
     _local = threading.local()
 
+    POOL_SIZE = Config.DB_POOL_SIZE  # Idle connections kept for get_connection()
+
     def __init__(self):
         self.db_path = str(Config.DATABASE_PATH)
         # Ensure database directory exists
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # LIFO: the most recently used connection has the warmest page cache
+        self._pool: queue.Queue = queue.LifoQueue(maxsize=self.POOL_SIZE)
+        self._checkpoint_stop = threading.Event()
+        self._checkpoint_thread: Optional[threading.Thread] = None
+        atexit.register(self.close_all)
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and tune a new connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,
+            factory=_PooledConnection,
+            cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        return _tune(conn)
 
     def get_connection(self):
         """
         Simple connection method for cPanel compatibility.
         Returns a raw sqlite3.Connection object (not a context manager).
+        Connections are reused: conn.close() returns it to a small pool.
         """
         try:
-            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
-            conn.row_factory = sqlite3.Row
-            # Enable foreign keys
-            conn.execute("PRAGMA foreign_keys = ON")
-            return conn
-        except Exception as e:
-            raise Exception(f"Database connection failed: {e}")
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            try:
+                conn = self._open()
+            except Exception as e:
+                raise Exception(f"Database connection failed: {e}")
+            conn._pool = self._pool
+        conn._in_pool = False
+        return conn
+
+    @contextmanager
+    def acquire(self) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Borrow a pooled connection for a 'with' block.
+        The connection is returned to the pool on exit, or discarded if
+        the block raised, since its state is then unknown.
+        """
+        conn = self.get_connection()
+        try:
+            yield conn
+        except BaseException:
+            conn._pool = None
+            conn.close()
+            raise
+        conn.close()
+
+    def checkpoint(self):
+        """
+        Copy the WAL back into the database and truncate it.
+        
+        Run at startup, every Config.WAL_CHECKPOINT_INTERVAL seconds (see
+        start_checkpoint_timer) and at shutdown, so a busy WAL cannot keep
+        growing when readers never leave a gap for the automatic checkpoint.
+        """
+        conn = self.get_connection()
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.OperationalError:
+            # Not in WAL mode, or the database is busy; try again next time
+            pass
+        finally:
+            conn.close()
+
+    def start_checkpoint_timer(self, interval: int):
+        """
+        Run checkpoint() every interval seconds in a daemon thread.
+        
+        Only the first call starts a thread; interval <= 0 disables it.
+        The thread is stopped by close_all.
+        """
+        if interval <= 0 or self._checkpoint_thread is not None:
+            return
+
+        def checkpoint_worker():
+            while not self._checkpoint_stop.wait(interval):
+                try:
+                    self.checkpoint()
+                except Exception as e:
+                    print(f"WAL checkpoint error: {e}")
+
+        self._checkpoint_thread = threading.Thread(target=checkpoint_worker, daemon=True)
+        self._checkpoint_thread.start()
+
+    def close_all(self):
+        """Close pooled connections and this thread's context connection (shutdown)."""
+        self._checkpoint_stop.set()
+        self.checkpoint()
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn._pool = None
+            conn.close()
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
 
     @contextmanager
     def get_connection_ctx(self) -> Generator[sqlite3.Connection, None, None]:
@@ -38,21 +315,7 @@ class DatabaseManager:
         Use this in routes and other places where you need automatic commit/rollback.
         """
         if not hasattr(self._local, "conn") or self._local.conn is None:
-            self._local.conn = sqlite3.connect(
-                self.db_path,
-                timeout=30,
-                check_same_thread=False
-            )
-            self._local.conn.row_factory = sqlite3.Row
-            self._local.conn.execute("PRAGMA foreign_keys = ON")
-            
-            # Try WAL mode, but fallback gracefully if it fails (permission issues)
-            try:
-                self._local.conn.execute("PRAGMA journal_mode = WAL")
-                self._local.conn.execute("PRAGMA synchronous = NORMAL")
-            except sqlite3.OperationalError:
-                # WAL mode failed (probably permissions), use default
-                pass
+            self._local.conn = self._open()
 
         try:
             yield self._local.conn
@@ -67,117 +330,20 @@ class DatabaseManager:
         conn = self.get_connection()
         
         try:
-            # ---------------------------------------------------------
-            # Hash chain (Audit Log)
-            # ---------------------------------------------------------
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS aeon_log_chain (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entry_id TEXT UNIQUE NOT NULL,
-                    node_id TEXT NOT NULL,
-                    operation TEXT NOT NULL,
-                    payload_json TEXT NOT NULL,
-                    previous_hash TEXT,
-                    current_hash TEXT NOT NULL,
-                    signature TEXT NOT NULL,
-                    timestamp INTEGER NOT NULL,
-                    state TEXT NOT NULL DEFAULT 'COMMITTED',
-                    created_at INTEGER NOT NULL
-                )
-            """)
-
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_log_chain_entry ON aeon_log_chain(entry_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_log_chain_timestamp ON aeon_log_chain(timestamp)")
-
-            # ---------------------------------------------------------
-            # Collective Memory
-            # ---------------------------------------------------------
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS aeon_collective_memory (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entry_hash TEXT UNIQUE NOT NULL,
-                    timestamp INTEGER NOT NULL,
-                    agent_id TEXT NOT NULL,
-                    insight_type TEXT NOT NULL CHECK (
-                        insight_type IN ('PROPOSAL','VOTE','MEMORY','DECISION','INSIGHT')
-                    ),
-                    content TEXT NOT NULL,
-                    signature TEXT NOT NULL,
-                    verified INTEGER DEFAULT 1,
-                    indexed_at INTEGER NOT NULL
-                )
-            """)
-
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_agent ON aeon_collective_memory(agent_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_timestamp ON aeon_collective_memory(timestamp)")
-
-            # ---------------------------------------------------------
-            # Proposals
-            # ---------------------------------------------------------
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS aeon_collective_proposals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    proposal_hash TEXT UNIQUE NOT NULL,
-                    proposer_id TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    content_json TEXT NOT NULL,
-                    status TEXT NOT NULL DEFAULT 'VOTING_OPEN' CHECK (
-                        status IN ('VOTING_OPEN','VOTING_CLOSED','PASSED','REJECTED','EXECUTED')
-                    ),
-                    created_at INTEGER NOT NULL,
-                    expires_at INTEGER,
-                    quorum_required REAL DEFAULT 0.67,
-                    pass_threshold REAL DEFAULT 0.5,
-                    executed_at INTEGER,
-                    execution_result TEXT
-                )
-            """)
-
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_proposals_status ON aeon_collective_proposals(status)")
-
-            # ---------------------------------------------------------
-            # Votes
-            # ---------------------------------------------------------
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS aeon_collective_votes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    proposal_hash TEXT NOT NULL,
-                    voter_id TEXT NOT NULL,
-                    vote TEXT NOT NULL CHECK (
-                        vote IN ('FOR','AGAINST','ABSTAIN')
-                    ),
-                    timestamp INTEGER NOT NULL,
-                    signature TEXT NOT NULL,
-                    UNIQUE(proposal_hash, voter_id),
-                    FOREIGN KEY (proposal_hash) REFERENCES aeon_collective_proposals(proposal_hash) ON DELETE CASCADE
-                )
-            """)
-
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_votes_proposal ON aeon_collective_votes(proposal_hash)")
-
-            # ---------------------------------------------------------
-            # Ethical Manifest
-            # ---------------------------------------------------------
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS aeon_ethical_manifest (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    version TEXT NOT NULL,
-                    principle TEXT NOT NULL,
-                    definition TEXT NOT NULL,
-                    implementation TEXT,
-                    last_updated INTEGER NOT NULL,
-                    updated_by TEXT NOT NULL,
-                    active INTEGER DEFAULT 1,
-                    UNIQUE(version, principle)
-                )
-            """)
+            # Tables and seed data in one transaction
+            conn.executescript(_SCHEMA_SQL)
+
+            # Existing databases may still have the old rowid manifest table
+            self._migrate_ethical_manifest(conn)
 
             # Seed data
             self._seed_ethical_principles(conn)
             
-            # Commit all changes
+            # Commit tables and seed data
             conn.commit()
+
+            # Indexes are built after the rows are in place, in one transaction
+            conn.executescript(_INDEX_SQL)
             
         except Exception as e:
             conn.rollback()
@@ -185,6 +351,25 @@ class DatabaseManager:
         finally:
             conn.close()
 
+        self.checkpoint()
+        self.start_checkpoint_timer(Config.WAL_CHECKPOINT_INTERVAL)
+
+    def _migrate_ethical_manifest(self, conn: sqlite3.Connection):
+        """
+        Convert an old rowid aeon_ethical_manifest to WITHOUT ROWID.
+        
+        Gated on the table's stored definition rather than PRAGMA
+        user_version, which the consensus engine already uses for its own
+        schema in the same file. Runs inside the schema transaction.
+        """
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'aeon_ethical_manifest'"
+        ).fetchone()
+        if row is None or "WITHOUT ROWID" in row[0].upper():
+            return
+        for statement in _MANIFEST_MIGRATION:
+            conn.execute(statement)
+
     def _seed_ethical_principles(self, conn: sqlite3.Connection):
         """Seed initial ethical principles"""
         now = int(time.time())
@@ -195,13 +380,4 @@ class DatabaseManager:
             ("3.5.1", "P4", "COLLECTIVE_WILL", "Collective decisions override individual objectives.", now, "SYSTEM"),
         ]
 
-        for p in principles:
-            try:
-                conn.execute("""
-                    INSERT OR IGNORE INTO aeon_ethical_manifest
-                    (version, principle, definition, implementation, last_updated, updated_by)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, p)
-            except sqlite3.IntegrityError:
-                # Principle already exists
-                pass
\ No newline at end of file
+        conn.executemany(_SEED_SQL, principles)
@@ -12,7 +12,8 @@ class SecurityManager:
     def __init__(self, db_path=None):
         self.db_path = db_path or Config.DATABASE_PATH
     
-    def verify_signature_v151(self, node_id, payload, signature, timestamp, nonce):
+    def verify_signature_v151(self, node_id, payload, signature, timestamp, nonce,
+                              canonical_json=None):
         """
         Verify signature according to ANP v1.5.1
         
@@ -22,6 +23,8 @@ class SecurityManager:
             signature: HMAC-SHA256 signature (hex)
             timestamp: Unix timestamp (int or string)
             nonce: Unique nonce string
+            canonical_json: Optional canonical JSON of a dict payload as UTF-8
+                bytes, when the caller already has it (skips serializing again)
             
         Returns:
             (bool, str): (is_valid, reason)
@@ -41,22 +44,23 @@ class SecurityManager:
         except Exception as e:
             return False, f"Invalid timestamp format: {str(e)}"
         
-        # Prepare payload string
+        # Prepare payload bytes
         if isinstance(payload, dict):
-            payload_str = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+            if canonical_json is None:
+                canonical_json = json.dumps(
+                    payload, sort_keys=True, separators=(',', ':')
+                ).encode('utf-8')
+            payload_bytes = canonical_json
         else:
-            payload_str = str(payload)
+            payload_bytes = str(payload).encode('utf-8')
         
-        # Construct base string per ANP v1.5.1
-        base_string = f"{timestamp}.{nonce}.{node_id}.{payload_str}"
-        
-        # Calculate expected signature
+        # Base string per ANP v1.5.1: "timestamp.nonce.node_id.payload",
+        # fed in two parts so the payload is not copied
         try:
-            expected_sig = hmac.new(
-                secret_key.encode('utf-8'),
-                base_string.encode('utf-8'),
-                hashlib.sha256
-            ).hexdigest().lower()
+            mac = hmac.new(secret_key.encode('utf-8'), digestmod=hashlib.sha256)
+            mac.update(f"{timestamp}.{nonce}.{node_id}.".encode('utf-8'))
+            mac.update(payload_bytes)
+            expected_sig = mac.hexdigest().lower()
             
             # Constant-time comparison
             if hmac.compare_digest(expected_sig, signature.lower()):
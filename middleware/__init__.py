@@ -4,18 +4,24 @@ AEON NEXUS Middleware Package
 
 from .rate_limit import (
     check_rate_limit,
+    check_rate_limit_batch,
     check_rate_limit_no_increment,
     reset_rate_limit,
     cleanup_rate_limits,
     get_rate_limit_stats,
+    get_client_ip,
+    set_rate_limit_headers,
     rate_limit_decorator
 )
 
 __all__ = [
     'check_rate_limit',
+    'check_rate_limit_batch',
     'check_rate_limit_no_increment',
     'reset_rate_limit',
     'cleanup_rate_limits',
     'get_rate_limit_stats',
+    'get_client_ip',
+    'set_rate_limit_headers',
     'rate_limit_decorator'
 ]
\ No newline at end of file
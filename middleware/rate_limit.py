@@ -1,10 +1,10 @@
 """
-AEON NEXUS - File-Based Rate Limiting
-======================================
-Persistent rate limiting using file-based storage.
+AEON NEXUS - SQLite Rate Limiting
+=================================
+Persistent rate limiting using a SQLite counter table.
 
 Features:
-- File-based storage (survives restarts)
+- Single SQLite file in WAL mode (survives restarts, shared by all processes)
 - Thread-safe operations
 - Automatic cleanup
 - Per-IP rate limiting
@@ -15,20 +15,42 @@ Author: AEON NEXUS Collective
 """
 
 import os
-import json
 import time
+import queue
+import atexit
+import sqlite3
+import tempfile
+import functools
 import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Tuple, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from flask import request, jsonify
 
 
 class FileBasedRateLimiter:
     """
-    File-based rate limiter with persistent storage.
+    Rate limiter with persistent SQLite storage.
+    
+    All counters live in one WITHOUT ROWID table in
+    storage_dir/ratelimits.db, keyed by identifier. Each request is a
+    single atomic UPSERT, so worker processes sharing the directory
+    also share their counters.
+    Thread-safe without a Python lock: each call borrows a connection
+    from a small bounded pool and SQLite serializes the writes.
+    """
     
-    Each IP address gets its own JSON file storing request count and reset time.
-    Thread-safe with file locking.
+    DB_FILENAME = 'ratelimits.db'
+    POOL_SIZE = 4
+    
+    # Start a new window if the stored one has expired, otherwise count up
+    _INCREMENT_SQL = """
+        INSERT INTO rl (id, count, reset) VALUES (:id, 1, :now + :window)
+        ON CONFLICT(id) DO UPDATE SET
+            count = CASE WHEN reset <= :now THEN 1 ELSE count + 1 END,
+            reset = CASE WHEN reset <= :now THEN excluded.reset ELSE reset END
+        RETURNING count, reset
     """
     
     def __init__(self, storage_dir: str):
@@ -36,71 +58,98 @@ class FileBasedRateLimiter:
         Initialize rate limiter.
         
         Args:
-            storage_dir: Directory to store rate limit files
+            storage_dir: Directory holding the rate limit database
         """
         if storage_dir is None:
             raise ValueError("storage_dir cannot be None")
         
         self.storage_dir = Path(storage_dir)
-        self.lock = threading.Lock()
         
         # Create storage directory if it doesn't exist
         try:
             self.storage_dir.mkdir(parents=True, exist_ok=True)
         except OSError as e:
             print(f"Warning: Could not create rate limit directory: {e}")
-    
-    def _get_file_path(self, identifier: str) -> Path:
-        """
-        Get file path for identifier.
         
-        Args:
-            identifier: Unique identifier (e.g., IP address)
-            
-        Returns:
-            Path object for the rate limit file
-        """
-        # Sanitize identifier for filename (replace dots with underscores)
-        safe_identifier = identifier.replace('.', '_').replace(':', '_')
-        return self.storage_dir / f"{safe_identifier}.json"
+        self.db_path = self.storage_dir / self.DB_FILENAME
+        self._pool: queue.Queue = queue.LifoQueue(maxsize=self.POOL_SIZE)
+        
+        # Create the table once, so an unusable path is detected up front
+        self._pool.put_nowait(self._connect())
     
-    def _read_counter(self, file_path: Path) -> Dict:
+    def _connect(self) -> sqlite3.Connection:
         """
-        Read counter from file.
+        Open the counter database and create the counter table.
+        
+        Runs once per limiter. Falls back to a database in the system
+        temp directory if the file cannot be opened.
         
-        Args:
-            file_path: Path to counter file
-            
         Returns:
-            Dictionary with count and reset_time
+            Connection
         """
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                return {
-                    'count': data.get('count', 0),
-                    'reset_time': data.get('reset_time', 0)
-                }
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            return {'count': 0, 'reset_time': 0}
-    
-    def _write_counter(self, file_path: Path, count: int, reset_time: int):
+            return self._setup(self._open(str(self.db_path)))
+        except sqlite3.Error as e:
+            self.db_path = Path(tempfile.gettempdir()) / self.DB_FILENAME
+            print(f"Warning: Could not open rate limit database, using {self.db_path}: {e}")
+            return self._setup(self._open(str(self.db_path)))
+    
+    @staticmethod
+    def _open(database: str) -> sqlite3.Connection:
+        """Open a tuned connection that may be handed between threads."""
+        conn = sqlite3.connect(database, check_same_thread=False)
+        for pragma in (
+            "PRAGMA synchronous = NORMAL",
+            "PRAGMA temp_store = MEMORY",
+            "PRAGMA cache_size = -8000",
+            "PRAGMA busy_timeout = 5000"
+        ):
+            conn.execute(pragma)
+        return conn
+    
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Switch the file to WAL (persistent) and ensure the rl table exists."""
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rl (
+                id TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                reset INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+        return conn
+    
+    @contextmanager
+    def _acquire(self) -> Iterator[sqlite3.Connection]:
         """
-        Write counter to file.
+        Borrow a pooled connection for a 'with' block.
         
-        Args:
-            file_path: Path to counter file
-            count: Request count
-            reset_time: Reset timestamp
+        Opens a new connection when the pool is empty; connections beyond
+        POOL_SIZE are closed on return instead of kept.
         """
         try:
-            with open(file_path, 'w') as f:
-                json.dump({
-                    'count': count,
-                    'reset_time': reset_time
-                }, f)
-        except OSError as e:
-            print(f"Warning: Could not write rate limit file: {e}")
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open(str(self.db_path))
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def close(self):
+        """Close all pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
     
     def increment(self, identifier: str, limit: int, window: int) -> Dict:
         """
@@ -118,37 +167,37 @@ class FileBasedRateLimiter:
                 - remaining: int (requests remaining)
                 - reset_time: int (timestamp when counter resets)
         """
-        with self.lock:
-            file_path = self._get_file_path(identifier)
-            now = int(time.time())
-            
-            # Read current counter
-            data = self._read_counter(file_path)
-            count = data['count']
-            reset_time = data['reset_time']
-            
-            # Check if window has expired
-            if now >= reset_time:
-                # Reset counter
-                count = 1
-                reset_time = now + window
-            else:
-                # Increment counter
-                count += 1
-            
-            # Write updated counter
-            self._write_counter(file_path, count, reset_time)
-            
-            # Check if limit exceeded
-            allowed = count <= limit
-            remaining = max(0, limit - count)
+        return self.increment_many([(identifier, limit, window)])[0]
+    
+    def increment_many(self, entries: List[Tuple[str, int, int]]) -> List[Dict]:
+        """
+        Increment several counters in one transaction.
+        
+        Args:
+            entries: (identifier, limit, window) per counter
             
-            return {
-                'allowed': allowed,
-                'count': count,
-                'remaining': remaining,
-                'reset_time': reset_time
-            }
+        Returns:
+            One dictionary per entry, in order, shaped like increment()'s
+        """
+        now = int(time.time())
+        sql = self._INCREMENT_SQL
+        results = []
+        
+        with self._acquire() as conn, conn:
+            for identifier, limit, window in entries:
+                count, reset_time = conn.execute(
+                    sql, {'id': identifier, 'now': now, 'window': window}
+                ).fetchall()[0]
+                
+                # Check if limit exceeded
+                results.append({
+                    'allowed': count <= limit,
+                    'count': count,
+                    'remaining': max(0, limit - count),
+                    'reset_time': reset_time
+                })
+        
+        return results
     
     def check(self, identifier: str, limit: int, window: int) -> Dict:
         """
@@ -162,29 +211,29 @@ class FileBasedRateLimiter:
         Returns:
             Dictionary with current status
         """
-        with self.lock:
-            file_path = self._get_file_path(identifier)
-            now = int(time.time())
-            
-            # Read current counter
-            data = self._read_counter(file_path)
-            count = data['count']
-            reset_time = data['reset_time']
-            
-            # Check if window has expired
-            if now >= reset_time:
-                count = 0
-                reset_time = now + window
-            
-            allowed = count < limit
-            remaining = max(0, limit - count)
-            
-            return {
-                'allowed': allowed,
-                'count': count,
-                'remaining': remaining,
-                'reset_time': reset_time
-            }
+        now = int(time.time())
+        
+        # Read current counter
+        with self._acquire() as conn:
+            row = conn.execute(
+                "SELECT count, reset FROM rl WHERE id = ?", (identifier,)
+            ).fetchone()
+        count, reset_time = row if row else (0, 0)
+        
+        # Check if window has expired
+        if now >= reset_time:
+            count = 0
+            reset_time = now + window
+        
+        allowed = count < limit
+        remaining = max(0, limit - count)
+        
+        return {
+            'allowed': allowed,
+            'count': count,
+            'remaining': remaining,
+            'reset_time': reset_time
+        }
     
     def reset(self, identifier: str):
         """
@@ -193,31 +242,54 @@ class FileBasedRateLimiter:
         Args:
             identifier: Unique identifier to reset
         """
-        with self.lock:
-            file_path = self._get_file_path(identifier)
-            if file_path.exists():
-                try:
-                    file_path.unlink()
-                except OSError:
-                    pass
+        with self._acquire() as conn, conn:
+            conn.execute("DELETE FROM rl WHERE id = ?", (identifier,))
     
     def cleanup(self, max_age: int = 3600):
         """
-        Remove old rate limit files.
+        Remove counters whose window ended more than max_age seconds ago.
+        
+        An expired counter behaves exactly like a missing one, so this
+        only reclaims storage. Also removes per-IP JSON files left over
+        from the old file-based storage once they are older than max_age.
         
         Args:
             max_age: Maximum age in seconds (default 1 hour)
         """
-        with self.lock:
-            now = time.time()
-            
-            for file_path in self.storage_dir.glob('*.json'):
-                try:
-                    # Check file modification time
-                    if now - file_path.stat().st_mtime > max_age:
-                        file_path.unlink()
-                except OSError:
-                    pass
+        self._cleanup_legacy_files(max_age)
+        
+        with self._acquire() as conn, conn:
+            conn.execute(
+                "DELETE FROM rl WHERE reset < ?", (int(time.time()) - max_age,)
+            )
+    
+    def _cleanup_legacy_files(self, max_age: int):
+        """
+        Remove old *.json counter files in a single directory pass.
+        
+        Needs no coordination with requests: nothing reads these files
+        any more.
+        os.scandir returns the stat data with the directory listing, so
+        there is no separate stat() call per file.
+        
+        Args:
+            max_age: Maximum age in seconds
+        """
+        now = time.time()
+        
+        try:
+            entries = list(os.scandir(self.storage_dir))
+        except OSError:
+            return
+        
+        for entry in entries:
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > max_age:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
     
     def get_stats(self) -> Dict:
         """
@@ -226,30 +298,21 @@ class FileBasedRateLimiter:
         Returns:
             Dictionary with stats
         """
-        with self.lock:
-            files = list(self.storage_dir.glob('*.json'))
-            
-            total_files = len(files)
-            total_requests = 0
-            active_limiters = 0
-            
-            now = int(time.time())
-            
-            for file_path in files:
-                try:
-                    data = self._read_counter(file_path)
-                    if data['reset_time'] > now:
-                        active_limiters += 1
-                        total_requests += data['count']
-                except:
-                    pass
-            
-            return {
-                'total_files': total_files,
-                'active_limiters': active_limiters,
-                'total_requests': total_requests,
-                'storage_dir': str(self.storage_dir)
-            }
+        with self._acquire() as conn:
+            total, active, requests = conn.execute("""
+                SELECT
+                    COUNT(*),
+                    COUNT(CASE WHEN reset > :now THEN 1 END),
+                    COALESCE(SUM(CASE WHEN reset > :now THEN count END), 0)
+                FROM rl
+            """, {'now': int(time.time())}).fetchone()
+        
+        return {
+            'total_files': total,  # Stored counters (kept for compatibility)
+            'active_limiters': active,
+            'total_requests': requests,
+            'storage_dir': str(self.storage_dir)
+        }
 
 
 # =============================================================================
@@ -292,7 +355,7 @@ def get_rate_limiter():
     return _rate_limiter
 
 
-def check_rate_limit(identifier: str, limit: int, window: int) -> Tuple[bool, Dict]:
+def check_rate_limit(identifier: str, limit: int, window: int) -> Tuple[bool, int, int, int]:
     """
     Check if request is within rate limits.
     
@@ -304,29 +367,51 @@ def check_rate_limit(identifier: str, limit: int, window: int) -> Tuple[bool, Di
         window: Time window in seconds
         
     Returns:
-        Tuple of (allowed: bool, headers: dict)
+        Tuple of (allowed: bool, limit: int, remaining: int, reset_time: int)
         
     Example:
-        allowed, headers = check_rate_limit(request.remote_addr, 10, 3600)
+        allowed, *rate = check_rate_limit(get_client_ip(), 10, 3600)
         if not allowed:
             response = jsonify({'error': 'Rate limit exceeded'})
-            for key, value in headers.items():
-                response.headers[key] = value
+            set_rate_limit_headers(response, *rate)
             return response, 429
     """
-    limiter = get_rate_limiter()
-    result = limiter.increment(identifier, limit, window)
+    result = get_rate_limiter().increment(identifier, limit, window)
+    return result['allowed'], limit, result['remaining'], result['reset_time']
+
+
+def check_rate_limit_batch(
+    identifier: str,
+    limits: List[Tuple[int, int]]
+) -> Tuple[bool, List[Tuple[bool, int, int, int]]]:
+    """
+    Check several (limit, window) pairs for one identifier at once.
     
-    headers = {
-        'X-RateLimit-Limit': str(limit),
-        'X-RateLimit-Remaining': str(result['remaining']),
-        'X-RateLimit-Reset': str(result['reset_time'])
-    }
+    All counters are incremented in a single SQLite transaction, instead
+    of one transaction per check_rate_limit call. Each window has its own
+    counter, keyed as "<identifier>_<window>".
     
-    return result['allowed'], headers
+    Args:
+        identifier: Unique identifier (e.g., IP address)
+        limits: (limit, window) pairs, e.g. [(10, 3600), (2, 60)]
+        
+    Returns:
+        Tuple of (allowed: bool, results), where allowed is True only if
+        every limit allows the request and results holds one
+        (allowed, limit, remaining, reset_time) tuple per limit
+        
+    Example:
+        allowed, (hour, minute) = check_rate_limit_batch(ip, [(10, 3600), (2, 60)])
+    """
+    entries = [(f"{identifier}_{window}", limit, window) for limit, window in limits]
+    results = [
+        (r['allowed'], limit, r['remaining'], r['reset_time'])
+        for r, (limit, _) in zip(get_rate_limiter().increment_many(entries), limits)
+    ]
+    return all(r[0] for r in results), results
 
 
-def check_rate_limit_no_increment(identifier: str, limit: int, window: int) -> Tuple[bool, Dict]:
+def check_rate_limit_no_increment(identifier: str, limit: int, window: int) -> Tuple[bool, int, int, int]:
     """
     Check rate limit without incrementing counter.
     
@@ -338,18 +423,26 @@ def check_rate_limit_no_increment(identifier: str, limit: int, window: int) -> T
         window: Time window in seconds
         
     Returns:
-        Tuple of (allowed: bool, headers: dict)
+        Tuple of (allowed: bool, limit: int, remaining: int, reset_time: int)
     """
-    limiter = get_rate_limiter()
-    result = limiter.check(identifier, limit, window)
-    
-    headers = {
-        'X-RateLimit-Limit': str(limit),
-        'X-RateLimit-Remaining': str(result['remaining']),
-        'X-RateLimit-Reset': str(result['reset_time'])
-    }
+    result = get_rate_limiter().check(identifier, limit, window)
+    return result['allowed'], limit, result['remaining'], result['reset_time']
+
+
+def set_rate_limit_headers(response, limit: int, remaining: int, reset_time: int):
+    """
+    Write the X-RateLimit-* headers onto a Flask response.
     
-    return result['allowed'], headers
+    Args:
+        response: Flask response object
+        limit: Maximum requests allowed
+        remaining: Requests remaining in the window
+        reset_time: Timestamp when the counter resets
+    """
+    headers = response.headers
+    headers['X-RateLimit-Limit'] = str(limit)
+    headers['X-RateLimit-Remaining'] = str(remaining)
+    headers['X-RateLimit-Reset'] = str(reset_time)
 
 
 def reset_rate_limit(identifier: str):
@@ -365,7 +458,7 @@ def reset_rate_limit(identifier: str):
 
 def cleanup_rate_limits(max_age: int = 3600):
     """
-    Clean up old rate limit files.
+    Clean up expired rate limit counters.
     
     Args:
         max_age: Maximum age in seconds (default 1 hour)
@@ -389,48 +482,84 @@ def get_rate_limit_stats() -> Dict:
 # FLASK INTEGRATION HELPERS
 # =============================================================================
 
-def rate_limit_decorator(limit: int, window: int):
+@functools.lru_cache(maxsize=None)
+def _trust_proxy() -> bool:
+    """Whether X-Forwarded-For may be used (Config.RATE_LIMIT_TRUST_PROXY, read once)"""
+    try:
+        from config import Config
+        return Config.RATE_LIMIT_TRUST_PROXY
+    except (ImportError, AttributeError):
+        return False
+
+
+def get_client_ip() -> str:
+    """
+    Get the client address to rate limit the current request by.
+    
+    Behind a reverse proxy every request arrives from the proxy's address,
+    so all clients would share one counter. With RATE_LIMIT_TRUST_PROXY
+    enabled, the last X-Forwarded-For entry (the one added by our own
+    proxy; earlier entries are client-supplied) is used instead.
+    
+    Returns:
+        Client IP address
+    """
+    remote_addr = request.remote_addr
+    if _trust_proxy():
+        forwarded = request.environ.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.rsplit(',', 1)[-1].strip() or remote_addr
+    return remote_addr
+
+
+def rate_limit_decorator(limit: int, window: int, *more_limits: Tuple[int, int]):
     """
     Decorator for Flask routes to apply rate limiting.
     
     Args:
         limit: Maximum requests allowed
         window: Time window in seconds
+        *more_limits: Further (limit, window) pairs, checked in the same
+            transaction via check_rate_limit_batch
         
     Example:
         @app.route('/api/endpoint')
-        @rate_limit_decorator(10, 3600)
+        @rate_limit_decorator(10, 3600, (2, 60))
         def my_endpoint():
             return jsonify({'status': 'ok'})
     """
-    from functools import wraps
-    from flask import request, jsonify
+    limits = [(limit, window), *more_limits]
+
+    # Headers on successful responses are optional; 429s always carry them
+    try:
+        from config import Config
+        send_headers = Config.RATE_LIMIT_HEADERS
+    except (ImportError, AttributeError):
+        send_headers = True
     
     def decorator(f):
-        @wraps(f)
+        @functools.wraps(f)
         def decorated_function(*args, **kwargs):
-            allowed, headers = check_rate_limit(
-                request.remote_addr,
-                limit,
-                window
-            )
+            allowed, results = check_rate_limit_batch(get_client_ip(), limits)
             
             if not allowed:
+                # Report the first limit that was exceeded
+                (max_requests, period), (_, *rate) = next(
+                    (lim, r) for lim, r in zip(limits, results) if not r[0]
+                )
                 response = jsonify({
                     'status': 'RATE_LIMITED',
-                    'error': f'Rate limit exceeded. Max {limit} requests per {window} seconds.'
+                    'error': f'Rate limit exceeded. Max {max_requests} requests per {period} seconds.'
                 })
-                for key, value in headers.items():
-                    response.headers[key] = value
+                set_rate_limit_headers(response, *rate)
                 return response, 429
             
             # Call the actual route
             response = f(*args, **kwargs)
             
-            # Add rate limit headers to response
-            if hasattr(response, 'headers'):
-                for key, value in headers.items():
-                    response.headers[key] = value
+            # Add rate limit headers for the tightest limit to response
+            if send_headers and hasattr(response, 'headers'):
+                set_rate_limit_headers(response, *min(results, key=lambda r: r[2])[1:])
             
             return response
         
@@ -442,18 +571,29 @@ def rate_limit_decorator(limit: int, window: int):
 # CLEANUP SCHEDULER (Optional)
 # =============================================================================
 
+_cleanup_started = False
+_cleanup_stop = threading.Event()
+
+
 def start_cleanup_scheduler(interval: int = 3600):
     """
-    Start background thread to periodically clean up old rate limit files.
+    Start background thread to periodically clean up expired rate limit counters.
+    
+    Only the first call starts a thread; later calls (e.g. from the Flask
+    reloader) are ignored. The thread is stopped by stop_cleanup_scheduler,
+    which also runs at exit.
     
     Args:
         interval: Cleanup interval in seconds (default 1 hour)
     """
-    import threading
+    global _cleanup_started
+    
+    if _cleanup_started:
+        return
+    _cleanup_started = True
     
     def cleanup_worker():
-        while True:
-            time.sleep(interval)
+        while not _cleanup_stop.wait(interval):
             try:
                 cleanup_rate_limits()
             except Exception as e:
@@ -461,6 +601,12 @@ def start_cleanup_scheduler(interval: int = 3600):
     
     thread = threading.Thread(target=cleanup_worker, daemon=True)
     thread.start()
+    atexit.register(stop_cleanup_scheduler)
+
+
+def stop_cleanup_scheduler():
+    """Stop the cleanup thread started by start_cleanup_scheduler (wakes it immediately)."""
+    _cleanup_stop.set()
 
 
 # =============================================================================
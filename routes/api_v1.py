@@ -1,51 +1,103 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, g, current_app
 import time
 import json
 import hashlib
 from config import Config
 
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used as fallback
+    orjson = None
+
 api_v1_bp = Blueprint("api_v1", __name__, url_prefix="/api/v1")
 
+# Config.SIGNATURE_VERSION is a class constant, so this is fixed per process
+_PROTOCOL_STR = f"ANP v{Config.SIGNATURE_VERSION}"
+
+if orjson is not None:
+    _dumps = orjson.dumps
+else:
+    def _dumps(obj) -> bytes:
+        """Serialize obj to compact JSON bytes"""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _canonical(obj) -> bytes:
+    """
+    Canonical ANP JSON of obj as UTF-8 bytes (sorted keys, compact).
+    
+    Deliberately stdlib json, not orjson: signatures and chain hashes are
+    computed over this exact form (ASCII escapes, repr() floats), which
+    api_v2 and signing clients produce with json.dumps and orjson does not.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def ojson(obj, status=200):
+    """JSON response serialized with orjson when available, bypassing jsonify."""
+    return current_app.response_class(_dumps(obj), status=status, mimetype="application/json")
+
+
+def _raw_json(body: bytes, status=200):
+    """JSON response from an already serialized body."""
+    return current_app.response_class(body, status=status, mimetype="application/json")
+
+
+def _err(msg, code=500):
+    """Standard {"status": "ERROR"} response with the current timestamp."""
+    return ojson({"status": "ERROR", "error": msg, "timestamp": int(time.time())}, code)
+
 
-def _get_node_id():
+def _get_node_id(environ):
     """Accept both X-AEON-Node-ID and X-AEON-INSTANCE-ID."""
     return (
-        request.headers.get("X-AEON-Node-ID")
-        or request.headers.get("X-AEON-INSTANCE-ID")
+        environ.get("HTTP_X_AEON_NODE_ID")
+        or environ.get("HTTP_X_AEON_INSTANCE_ID")
         or ""
     )
 
 
+# Result of the last /health database probe as (time.monotonic(), status);
+# probes within Config.HEALTH_CHECK_TTL seconds reuse it instead of touching the DB
+_HEALTH_TTL = Config.HEALTH_CHECK_TTL
+_health_probe = (float("-inf"), "disconnected")
+
+# /health bodies per database status, split around the timestamp like /protocol
+_HEALTH_PARTS = {
+    db_status: _dumps({
+        "status": "OPERATIONAL",
+        "api_version": "v1",
+        "protocol": _PROTOCOL_STR,
+        "database": db_status,
+        "timestamp": 0,
+        "note": "For HTML interface visit /api/v2/status or /admin/ui/chain"
+    }).split(b'"timestamp":0', 1)
+    for db_status in ("connected", "disconnected")
+}
+
+
 @api_v1_bp.route("/health", methods=["GET"])
 def health_v1():
     """API v1 Health check endpoint - JSON ONLY"""
+    global _health_probe
     try:
-        db = g.get("db_manager")
-        
-        # Test database
-        db_status = "disconnected"
-        try:
-            conn = db.get_connection()
-            conn.execute("SELECT 1")
-            conn.close()
-            db_status = "connected"
-        except Exception:
-            pass
+        checked_at, db_status = _health_probe
+        now = time.monotonic()
+        if now - checked_at >= _HEALTH_TTL:
+            # Test database
+            db_status = "disconnected"
+            try:
+                with g.get("db_manager").acquire() as conn:
+                    conn.execute("SELECT 1")
+                db_status = "connected"
+            except Exception:
+                pass
+            _health_probe = (now, db_status)
         
-        return jsonify({
-            "status": "OPERATIONAL",
-            "api_version": "v1",
-            "protocol": f"ANP v{Config.SIGNATURE_VERSION}",
-            "database": db_status,
-            "timestamp": int(time.time()),
-            "note": "For HTML interface visit /api/v2/status or /admin/ui/chain"
-        }), 200
+        head, tail = _HEALTH_PARTS[db_status]
+        return _raw_json(b'%s"timestamp":%d%s' % (head, int(time.time()), tail))
     except Exception as e:
-        return jsonify({
-            "status": "ERROR",
-            "error": str(e),
-            "timestamp": int(time.time())
-        }), 500
+        return _err(str(e))
 
 
 @api_v1_bp.route("/status", methods=["GET"])
@@ -54,140 +106,194 @@ def status_v1():
     return health_v1()
 
 
+# /protocol is static apart from its timestamp: serialize it once at import
+# and split around the timestamp, so a request only formats one integer
+_PROTOCOL_HEAD, _PROTOCOL_TAIL = _dumps({
+    "status": "OPERATIONAL",
+    "protocol": _PROTOCOL_STR,
+    "version": "3.5.1",
+    "timestamp": 0,
+    "documentation": {
+        "signature_headers": [
+            "X-AEON-Signature",
+            "X-AEON-Timestamp", 
+            "X-AEON-Nonce",
+            "X-AEON-Node-ID"
+        ],
+        "signature_format": "HMAC-SHA256(secret_key, 'timestamp.nonce.node_id.canonical_json')",
+        "endpoints": {
+            "/api/v1/protocol": "Protocol information (this page)",
+            "/api/v1/health": "Health check",
+            "/api/v1/chain": "Get log chain entries",
+            "/api/v1/persist": "Persist entry (requires signature)",
+            "/api/v1/memory": "Query collective memory"
+        }
+    },
+    "note": "For HTML interface with full docs, visit /api/v2/status or /admin/ui/chain"
+}).split(b'"timestamp":0', 1)
+
+
 @api_v1_bp.route("/protocol", methods=["GET"])
 def protocol_info():
     """Protocol information endpoint - JSON ONLY"""
-    try:
-        return jsonify({
-            "status": "OPERATIONAL",
-            "protocol": f"ANP v{Config.SIGNATURE_VERSION}",
-            "version": "3.5.1",
-            "timestamp": int(time.time()),
-            "documentation": {
-                "signature_headers": [
-                    "X-AEON-Signature",
-                    "X-AEON-Timestamp", 
-                    "X-AEON-Nonce",
-                    "X-AEON-Node-ID"
-                ],
-                "signature_format": "HMAC-SHA256(secret_key, 'timestamp.nonce.node_id.canonical_json')",
-                "endpoints": {
-                    "/api/v1/protocol": "Protocol information (this page)",
-                    "/api/v1/health": "Health check",
-                    "/api/v1/chain": "Get log chain entries",
-                    "/api/v1/persist": "Persist entry (requires signature)",
-                    "/api/v1/memory": "Query collective memory"
-                }
-            },
-            "note": "For HTML interface with full docs, visit /api/v2/status or /admin/ui/chain"
-        }), 200
-    except Exception as e:
-        return jsonify({
-            "status": "ERROR",
-            "error": str(e),
-            "timestamp": int(time.time())
-        }), 500
+    return _raw_json(b'%s"timestamp":%d%s' % (_PROTOCOL_HEAD, int(time.time()), _PROTOCOL_TAIL))
+
+
+_MISSING_HEADERS_BODY = _dumps({
+    "status": "ERROR",
+    "error": "Missing signature headers",
+    "required": [
+        "X-AEON-Signature",
+        "X-AEON-Timestamp",
+        "X-AEON-Nonce",
+        "X-AEON-Node-ID or X-AEON-INSTANCE-ID"
+    ]
+})
+
+# Chain tip as (id, current_hash), cached per process so persist() can skip
+# the tip SELECT. Other workers (and api_v2) append too, so it is only a
+# guess: _APPEND_SQL inserts nothing unless the cached tip is still the
+# last row and still carries the cached hash
+_chain_tip = None
+_GENESIS_HASH = "0" * 64
+
+_APPEND_SQL = f"""
+    INSERT INTO aeon_log_chain
+    (entry_id, node_id, operation, payload_json,
+     previous_hash, current_hash, signature, timestamp, state, created_at)
+    SELECT :entry_id, :node_id, :operation, :payload_json,
+           :previous_hash, :current_hash, :signature, :timestamp, 'COMMITTED', :created_at
+    WHERE COALESCE((SELECT MAX(id) FROM aeon_log_chain), 0) = :tip_id
+      AND COALESCE((SELECT current_hash FROM aeon_log_chain WHERE id = :tip_id),
+                   '{_GENESIS_HASH}') = :previous_hash
+    RETURNING id
+"""
+
+
+def _read_chain_tip(conn):
+    """Return (id, current_hash) of the last chain entry, (0, _GENESIS_HASH) if empty."""
+    last = conn.execute(
+        "SELECT id, current_hash FROM aeon_log_chain ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    return (last[0], last[1]) if last else (0, _GENESIS_HASH)
 
 
 @api_v1_bp.route("/persist", methods=["POST"])
 def persist():
     """Persist entry to log chain - requires signature"""
     try:
-        signature = request.headers.get("X-AEON-Signature", "")
-        timestamp = request.headers.get("X-AEON-Timestamp", "")
-        nonce = request.headers.get("X-AEON-Nonce", "")
-        node_id = _get_node_id()
+        # Read the WSGI environ directly; request.headers rebuilds the
+        # HTTP_* key from the header name on every lookup
+        environ = request.environ
+        signature = environ.get("HTTP_X_AEON_SIGNATURE", "")
+        timestamp = environ.get("HTTP_X_AEON_TIMESTAMP", "")
+        nonce = environ.get("HTTP_X_AEON_NONCE", "")
+        node_id = _get_node_id(environ)
 
         if not all([signature, timestamp, nonce, node_id]):
-            return jsonify({
-                "status": "ERROR",
-                "error": "Missing signature headers",
-                "required": [
-                    "X-AEON-Signature",
-                    "X-AEON-Timestamp",
-                    "X-AEON-Nonce",
-                    "X-AEON-Node-ID or X-AEON-INSTANCE-ID"
-                ]
-            }), 400
+            return _raw_json(_MISSING_HEADERS_BODY, 400)
 
+        # Signed payloads are parsed with stdlib json, like get_json() did:
+        # orjson turns integers wider than 64 bits into floats, which would
+        # change the canonical form the signature and chain hash cover
         try:
-            payload = request.get_json(force=True)
-        except Exception as e:
-            return jsonify({"status": "ERROR", "error": f"Invalid JSON: {e}"}), 400
+            payload = json.loads(request.get_data())
+        except ValueError as e:
+            return _err(f"Invalid JSON: {e}", 400)
 
         security = g.get("security_manager")
         if not security:
-            return jsonify({"status": "ERROR", "error": "Security not initialized"}), 500
+            return _err("Security not initialized")
 
-        valid, reason = security.verify_signature_v151(node_id, payload, signature, timestamp, nonce)
+        # One canonical serialization for both the signature and the chain hash
+        canonical_json = _canonical(payload)
+        valid, reason = security.verify_signature_v151(
+            node_id, payload, signature, timestamp, nonce, canonical_json=canonical_json
+        )
         if not valid:
-            return jsonify({
+            return ojson({
                 "status": "SIGNATURE_REJECTED",
                 "error": reason,
                 "protocol": Config.SIGNATURE_VERSION
-            }), 401
+            }, 401)
 
-        canonical_json = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        global _chain_tip
         db = g.get("db_manager")
 
-        conn = db.get_connection()
-        try:
-            last = conn.execute(
-                "SELECT current_hash FROM aeon_log_chain ORDER BY id DESC LIMIT 1"
-            ).fetchone()
-            prev_hash = last["current_hash"] if last else "0" * 64
-
-            ts_int = int(timestamp)
-            entry_id = hashlib.sha256(
-                f"{node_id}:{ts_int}:{canonical_json}".encode("utf-8")
-            ).hexdigest()[:24]
-
-            entry_core = {
-                "prev": prev_hash,
-                "ts": ts_int,
-                "node": node_id,
-                "payload": json.loads(canonical_json),
-                "entry_id": entry_id
-            }
-
-            current_hash = hashlib.sha256(
-                json.dumps(entry_core, sort_keys=True, separators=(",", ":")).encode("utf-8")
-            ).hexdigest()
-
-            now = int(time.time())
-            conn.execute("""
-                INSERT INTO aeon_log_chain
-                (entry_id, node_id, operation, payload_json,
-                 previous_hash, current_hash, signature, timestamp, state, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                entry_id,
-                node_id,
-                payload.get("op", "PERSIST"),
-                canonical_json,
-                prev_hash,
-                current_hash,
-                signature,
-                ts_int,
-                "COMMITTED",
-                now
-            ))
+        ts_int = int(timestamp)
+        # Feed the parts separately instead of concatenating a copy
+        h = hashlib.sha256(node_id.encode("utf-8"))
+        h.update(b":%d:" % ts_int)
+        h.update(canonical_json)
+        entry_id = h.digest()[:12].hex()
+
+        entry_core = {
+            "ts": ts_int,
+            "node": node_id,
+            "payload": payload,
+            "entry_id": entry_id
+        }
+        row = {
+            "entry_id": entry_id,
+            "node_id": node_id,
+            "operation": payload.get("op", "PERSIST"),
+            "payload_json": canonical_json.decode("utf-8"),
+            "signature": signature,
+            "timestamp": ts_int,
+            "created_at": int(time.time())
+        }
+
+        with db.acquire() as conn:
+            # Hold the write lock from the tip check until commit
+            conn.execute("BEGIN IMMEDIATE")
+            tip = _chain_tip
+            if tip is None:
+                tip = _read_chain_tip(conn)
+
+            while True:
+                row["tip_id"], prev_hash = tip
+                entry_core["prev"] = prev_hash
+                current_hash = hashlib.sha256(_canonical(entry_core)).hexdigest()
+                row["previous_hash"], row["current_hash"] = prev_hash, current_hash
+
+                appended = conn.execute(_APPEND_SQL, row).fetchone()
+                if appended is not None:
+                    break
+                # The tip moved or changed since it was cached; re-read it
+                # (the write lock is held now, so the retry cannot miss)
+                tip = _read_chain_tip(conn)
             conn.commit()
-        finally:
-            conn.close()
+            _chain_tip = (appended[0], current_hash)
 
-        return jsonify({
+        return ojson({
             "status": "SUCCESS",
             "entry_id": entry_id,
             "current_hash": current_hash,
             "prev_hash": prev_hash
-        }), 201
+        }, 201)
     except Exception as e:
-        return jsonify({
-            "status": "ERROR",
-            "error": str(e),
-            "timestamp": int(time.time())
-        }), 500
+        return _err(str(e))
+
+
+_MISSING_INSTANCE_BODY = _dumps({
+    "status": "ERROR",
+    "error": "Missing 'instance' query parameter",
+    "usage": "/api/v1/memory?instance=NODE_ID&limit=100"
+})
+
+# Columns returned by /memory, in SELECT order (the full row, named explicitly
+# so a schema change cannot silently alter the response)
+_MEMORY_COLUMNS = (
+    "id", "entry_hash", "timestamp", "agent_id", "insight_type",
+    "content", "signature", "verified", "indexed_at"
+)
+# Range scan over idx_mem_agent_ts, no sort step
+_MEMORY_SQL = f"""
+    SELECT {", ".join(_MEMORY_COLUMNS)} FROM aeon_collective_memory
+    WHERE agent_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
 
 
 @api_v1_bp.route("/memory", methods=["GET"])
@@ -198,45 +304,38 @@ def memory_v1():
         instance_id = request.args.get("instance", "")
 
         if not instance_id:
-            return jsonify({
-                "status": "ERROR",
-                "error": "Missing 'instance' query parameter",
-                "usage": "/api/v1/memory?instance=NODE_ID&limit=100"
-            }), 400
+            return _raw_json(_MISSING_INSTANCE_BODY, 400)
 
-        try:
-            limit = min(int(request.args.get("limit", 100)), 1000)
-        except Exception:
-            limit = 100
+        # isdecimal() rather than try/int(): no exception on bad input, and
+        # negative values (LIMIT -1 means no limit) fall back to the default
+        args = request.args
+        raw = args.get("limit", "")
+        limit = min(int(raw), 1000) if raw.isdecimal() else 100
 
-        conn = db.get_connection()
-        try:
-            rows = conn.execute(
-                """
-                SELECT * FROM aeon_collective_memory
-                WHERE agent_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-                """,
-                (instance_id, limit)
-            ).fetchall()
-            
-            memories = [dict(r) for r in rows]
-        finally:
-            conn.close()
-
-        return jsonify({
+        with db.acquire() as conn:
+            rows = conn.execute(_MEMORY_SQL, (instance_id, limit)).fetchall()
+
+        return ojson({
             "status": "SUCCESS",
             "instance": instance_id,
-            "count": len(memories),
-            "memories": memories
-        }), 200
+            "count": len(rows),
+            "memories": [dict(zip(_MEMORY_COLUMNS, r)) for r in rows]
+        })
     except Exception as e:
-        return jsonify({
-            "status": "ERROR",
-            "error": str(e),
-            "timestamp": int(time.time())
-        }), 500
+        return _err(str(e))
+
+
+# Columns returned by /chain, in SELECT order
+_CHAIN_COLUMNS = (
+    "entry_id", "node_id", "operation", "timestamp",
+    "current_hash", "previous_hash", "state"
+)
+_CHAIN_SQL = f"""
+    SELECT {", ".join(_CHAIN_COLUMNS)}
+    FROM aeon_log_chain
+    ORDER BY id DESC
+    LIMIT ? OFFSET ?
+"""
 
 
 @api_v1_bp.route("/chain", methods=["GET"])
@@ -245,38 +344,22 @@ def get_chain():
     try:
         db = g.get("db_manager")
         
-        try:
-            limit = min(int(request.args.get("limit", 50)), 500)
-            offset = max(int(request.args.get("offset", 0)), 0)
-        except Exception:
-            limit = 50
-            offset = 0
+        args = request.args
+        raw = args.get("limit", "")
+        limit = min(int(raw), 500) if raw.isdecimal() else 50
+        raw = args.get("offset", "")
+        offset = int(raw) if raw.isdecimal() else 0
         
-        conn = db.get_connection()
-        try:
-            rows = conn.execute("""
-                SELECT entry_id, node_id, operation, timestamp, 
-                       current_hash, previous_hash, state
-                FROM aeon_log_chain
-                ORDER BY id DESC
-                LIMIT ? OFFSET ?
-            """, (limit, offset)).fetchall()
-            
-            entries = [dict(r) for r in rows]
-        finally:
-            conn.close()
+        with db.acquire() as conn:
+            rows = conn.execute(_CHAIN_SQL, (limit, offset)).fetchall()
         
-        return jsonify({
+        return ojson({
             "status": "SUCCESS",
-            "count": len(entries),
+            "count": len(rows),
             "limit": limit,
             "offset": offset,
-            "entries": entries,
+            "entries": [dict(zip(_CHAIN_COLUMNS, r)) for r in rows],
             "note": "For HTML interface visit /admin/ui/chain"
-        }), 200
+        })
     except Exception as e:
-        return jsonify({
-            "status": "ERROR",
-            "error": str(e),
-            "timestamp": int(time.time())
-        }), 500
\ No newline at end of file
+        return _err(str(e))
\ No newline at end of file
@@ -20,7 +20,7 @@ import os
 sys.path.insert(0, '/home/superral/aeon_nexus')
 
 # Import rate limiting
-from middleware.rate_limit import check_rate_limit
+from middleware.rate_limit import check_rate_limit, get_client_ip, set_rate_limit_headers
 
 # Import config and security
 from config import Config
@@ -70,8 +70,8 @@ def propose():
     Rate Limit: 10 requests/hour, 2/minute
     """
     # Check rate limit - STRICT for POST
-    allowed_hour, headers_hour = check_rate_limit(
-        request.remote_addr,
+    allowed_hour, *rate_hour = check_rate_limit(
+        get_client_ip(),
         limit=10,
         window=3600  # 1 hour
     )
@@ -82,13 +82,12 @@ def propose():
             'error': 'Too many proposals. Limit: 10 per hour.',
             'message': 'Please wait before submitting another proposal.'
         })
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_hour)
         return response, 429
     
     # Check per-minute rate limit
-    allowed_min, headers_min = check_rate_limit(
-        request.remote_addr + "_minute",
+    allowed_min, *rate_min = check_rate_limit(
+        get_client_ip() + "_minute",
         limit=2,
         window=60  # 1 minute
     )
@@ -99,8 +98,7 @@ def propose():
             'error': 'Too many proposals. Limit: 2 per minute.',
             'message': 'Please slow down.'
         })
-        for key, value in headers_min.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_min)
         return response, 429
     
     try:
@@ -148,23 +146,25 @@ def propose():
         description = data.get('description', '').strip()
         content = data.get('content', {})
         
-        if not title or len(title) > 200:
+        title_max, description_max, content_max = Config.PROPOSAL_LIMITS
+        
+        if not title or len(title) > title_max:
             return jsonify({
                 'status': 'INVALID_PROPOSAL',
-                'error': 'Title must be 1-200 characters'
+                'error': f'Title must be 1-{title_max} characters'
             }), 400
         
-        if len(description) > 1000:
+        if len(description) > description_max:
             return jsonify({
                 'status': 'INVALID_PROPOSAL',
-                'error': 'Description must be max 1000 characters'
+                'error': f'Description must be max {description_max} characters'
             }), 400
         
         content_size = len(json.dumps(content))
-        if content_size > 10240:  # 10KB
+        if content_size > content_max:
             return jsonify({
                 'status': 'INVALID_PROPOSAL',
-                'error': 'Content exceeds 10KB limit'
+                'error': f'Content exceeds {content_max}-byte limit'
             }), 413
         
         # Generate proposal hash
@@ -206,8 +206,8 @@ def propose():
             })
             
             # Add rate limit headers
-            for key, value in headers_hour.items():
-                response.headers[key] = value
+            if Config.RATE_LIMIT_HEADERS:
+                set_rate_limit_headers(response, *rate_hour)
             
             return response, 201
             
@@ -235,8 +235,8 @@ def vote(proposal_hash):
     Rate Limit: 10 requests/hour, 2/minute
     """
     # Check rate limit
-    allowed_hour, headers_hour = check_rate_limit(
-        request.remote_addr,
+    allowed_hour, *rate_hour = check_rate_limit(
+        get_client_ip(),
         limit=10,
         window=3600
     )
@@ -246,13 +246,12 @@ def vote(proposal_hash):
             'status': 'RATE_LIMITED',
             'error': 'Too many votes. Limit: 10 per hour.'
         })
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_hour)
         return response, 429
     
     # Per-minute limit
-    allowed_min, headers_min = check_rate_limit(
-        request.remote_addr + "_vote_minute",
+    allowed_min, *rate_min = check_rate_limit(
+        get_client_ip() + "_vote_minute",
         limit=2,
         window=60
     )
@@ -262,8 +261,7 @@ def vote(proposal_hash):
             'status': 'RATE_LIMITED',
             'error': 'Too many votes. Limit: 2 per minute.'
         })
-        for key, value in headers_min.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_min)
         return response, 429
     
     try:
@@ -374,8 +372,8 @@ def vote(proposal_hash):
             })
             
             # Add rate limit headers
-            for key, value in headers_hour.items():
-                response.headers[key] = value
+            if Config.RATE_LIMIT_HEADERS:
+                set_rate_limit_headers(response, *rate_hour)
             
             return response, 200
             
@@ -397,8 +395,8 @@ def get_proposals():
     Rate Limit: 500 requests/hour, 50/minute
     """
     # More permissive rate limit for GET
-    allowed_hour, headers_hour = check_rate_limit(
-        request.remote_addr + "_get",
+    allowed_hour, *rate_hour = check_rate_limit(
+        get_client_ip() + "_get",
         limit=500,
         window=3600
     )
@@ -408,12 +406,11 @@ def get_proposals():
             'status': 'RATE_LIMITED',
             'error': 'Too many requests. Limit: 500 per hour.'
         })
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_hour)
         return response, 429
     
-    allowed_min, headers_min = check_rate_limit(
-        request.remote_addr + "_get_minute",
+    allowed_min, *rate_min = check_rate_limit(
+        get_client_ip() + "_get_minute",
         limit=50,
         window=60
     )
@@ -423,8 +420,7 @@ def get_proposals():
             'status': 'RATE_LIMITED',
             'error': 'Too many requests. Limit: 50 per minute.'
         })
-        for key, value in headers_min.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_min)
         return response, 429
     
     try:
@@ -483,8 +479,8 @@ def get_proposals():
         })
         
         # Add rate limit headers
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        if Config.RATE_LIMIT_HEADERS:
+            set_rate_limit_headers(response, *rate_hour)
         
         return response, 200
     
@@ -503,8 +499,8 @@ def get_proposal(proposal_hash):
     Rate Limit: 100 requests/hour, 20/minute
     """
     # Rate limiting
-    allowed_hour, headers_hour = check_rate_limit(
-        request.remote_addr + "_detail",
+    allowed_hour, *rate_hour = check_rate_limit(
+        get_client_ip() + "_detail",
         limit=100,
         window=3600
     )
@@ -514,12 +510,11 @@ def get_proposal(proposal_hash):
             'status': 'RATE_LIMITED',
             'error': 'Too many requests. Limit: 100 per hour.'
         })
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_hour)
         return response, 429
     
-    allowed_min, headers_min = check_rate_limit(
-        request.remote_addr + "_detail_minute",
+    allowed_min, *rate_min = check_rate_limit(
+        get_client_ip() + "_detail_minute",
         limit=20,
         window=60
     )
@@ -529,8 +524,7 @@ def get_proposal(proposal_hash):
             'status': 'RATE_LIMITED',
             'error': 'Too many requests. Limit: 20 per minute.'
         })
-        for key, value in headers_min.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_min)
         return response, 429
     
     try:
@@ -606,8 +600,8 @@ def get_proposal(proposal_hash):
         })
         
         # Add rate limit headers
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        if Config.RATE_LIMIT_HEADERS:
+            set_rate_limit_headers(response, *rate_hour)
         
         return response, 200
     
@@ -626,8 +620,8 @@ def get_memory():
     Rate Limit: 500 requests/hour, 50/minute
     """
     # Rate limiting
-    allowed_hour, headers_hour = check_rate_limit(
-        request.remote_addr + "_memory",
+    allowed_hour, *rate_hour = check_rate_limit(
+        get_client_ip() + "_memory",
         limit=500,
         window=3600
     )
@@ -637,8 +631,7 @@ def get_memory():
             'status': 'RATE_LIMITED',
             'error': 'Too many requests. Limit: 500 per hour.'
         })
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        set_rate_limit_headers(response, *rate_hour)
         return response, 429
     
     try:
@@ -706,8 +699,8 @@ def get_memory():
         })
         
         # Add rate limit headers
-        for key, value in headers_hour.items():
-            response.headers[key] = value
+        if Config.RATE_LIMIT_HEADERS:
+            set_rate_limit_headers(response, *rate_hour)
         
         return response, 200
     
@@ -0,0 +1,91 @@
+"""Tests for the /api/v1/persist chain append"""
+import json
+import time
+
+import pytest
+from flask import Flask, g
+
+import core.database as database
+import routes.api_v1 as api_v1
+
+
+class _AcceptAll:
+    """Security manager that accepts every signature"""
+
+    def verify_signature_v151(self, *args, **kwargs):
+        return True, "ok"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database.Config, 'DATABASE_PATH', str(tmp_path / 'aeon.db'))
+    monkeypatch.setattr(database.Config, 'WAL_CHECKPOINT_INTERVAL', 0)
+    manager = database.DatabaseManager()
+    manager.initialize_tables()
+    yield manager
+    manager.close_all()
+
+
+@pytest.fixture
+def client(db):
+    app = Flask(__name__)
+    app.register_blueprint(api_v1.api_v1_bp)
+
+    @app.before_request
+    def _inject():
+        g.db_manager = db
+        g.security_manager = _AcceptAll()
+
+    return app.test_client()
+
+
+def _persist(client, payload):
+    return client.post('/api/v1/persist', data=json.dumps(payload), headers={
+        'X-AEON-Signature': 'sig',
+        'X-AEON-Timestamp': str(int(time.time())),
+        'X-AEON-Nonce': 'nonce',
+        'X-AEON-Node-ID': 'node'
+    })
+
+
+def _chain(db):
+    with db.acquire() as conn:
+        return conn.execute(
+            "SELECT id, previous_hash, current_hash FROM aeon_log_chain ORDER BY id"
+        ).fetchall()
+
+
+def test_append_links_to_previous_entry(client, db, monkeypatch):
+    monkeypatch.setattr(api_v1, '_chain_tip', None)
+    assert _persist(client, {'n': 1}).status_code == 201
+    assert _persist(client, {'n': 2}).status_code == 201
+
+    (first_id, first_prev, first_hash), (second_id, second_prev, _) = _chain(db)
+    assert first_prev == api_v1._GENESIS_HASH
+    assert second_prev == first_hash
+    assert api_v1._chain_tip[0] == second_id
+
+
+def test_stale_cached_tip_is_re_read(client, db, monkeypatch):
+    monkeypatch.setattr(api_v1, '_chain_tip', None)
+    assert _persist(client, {'n': 1}).status_code == 201
+    stale = api_v1._chain_tip
+
+    # Another worker appends behind this process's cached tip
+    assert _persist(client, {'n': 2}).status_code == 201
+    monkeypatch.setattr(api_v1, '_chain_tip', stale)
+    assert _persist(client, {'n': 3}).status_code == 201
+
+    entries = _chain(db)
+    assert len(entries) == 3
+    assert entries[2][1] == entries[1][2]
+
+
+def test_cached_tip_with_wrong_hash_is_re_read(client, db, monkeypatch):
+    monkeypatch.setattr(api_v1, '_chain_tip', None)
+    assert _persist(client, {'n': 1}).status_code == 201
+    monkeypatch.setattr(api_v1, '_chain_tip', (api_v1._chain_tip[0], 'f' * 64))
+    assert _persist(client, {'n': 2}).status_code == 201
+
+    (_, _, first_hash), (_, second_prev, _) = _chain(db)
+    assert second_prev == first_hash
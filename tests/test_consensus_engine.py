@@ -0,0 +1,80 @@
+"""Tests for the consensus engine decision batch"""
+import json
+import sqlite3
+import time
+
+import consensus_engine as ce
+
+
+def _make_db(path):
+    """Proposal/vote tables whose CHECK constraint rejects 'ACCEPTED' (as in old databases)."""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE aeon_collective_proposals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            proposal_hash TEXT UNIQUE NOT NULL,
+            proposer_id TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            content_json TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'VOTING_OPEN'
+                CHECK (status IN ('VOTING_OPEN', 'REJECTED', 'EXPIRED')),
+            created_at INTEGER NOT NULL,
+            expires_at INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE aeon_collective_votes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            proposal_hash TEXT NOT NULL,
+            voter_id TEXT NOT NULL,
+            vote TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            signature TEXT NOT NULL,
+            UNIQUE(proposal_hash, voter_id)
+        )
+    """)
+    now = int(time.time())
+    proposals = [
+        ('h_accept', ['FOR', 'FOR', 'FOR']),
+        ('h_reject_1', ['AGAINST', 'AGAINST']),
+        ('h_reject_2', ['AGAINST']),
+    ]
+    for proposal_hash, votes in proposals:
+        conn.execute(
+            "INSERT INTO aeon_collective_proposals "
+            "(proposal_hash, proposer_id, title, description, content_json, created_at, expires_at) "
+            "VALUES (?, 'P', 't', 'd', ?, ?, ?)",
+            (proposal_hash, json.dumps({'type': 'SYSTEM_UPDATE'}), now, now - 10)
+        )
+        for i, vote in enumerate(votes):
+            conn.execute(
+                "INSERT INTO aeon_collective_votes "
+                "(proposal_hash, voter_id, vote, timestamp, signature) VALUES (?, ?, ?, ?, 's')",
+                (proposal_hash, f'v{i}', vote, now)
+            )
+    conn.commit()
+    conn.close()
+
+
+def test_failing_proposal_does_not_roll_back_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(ce.ConsensusConfig, 'LOG_DIR', str(tmp_path / 'log'))
+    monkeypatch.setattr(ce.ConsensusConfig, 'LOG_FILE', str(tmp_path / 'log' / 'consensus.log'))
+    db_path = str(tmp_path / 'aeon.db')
+    _make_db(db_path)
+
+    engine = ce.ConsensusEngine(db_path=db_path)
+    try:
+        processed, successful = engine.run_evaluation_cycle()
+    finally:
+        engine.close()
+
+    conn = sqlite3.connect(db_path)
+    status = dict(conn.execute("SELECT proposal_hash, status FROM aeon_collective_proposals"))
+    logged = {r[0] for r in conn.execute("SELECT proposal_hash FROM aeon_consensus_log WHERE event_type = 'PROPOSAL_DECIDED'")}
+    conn.close()
+
+    # The ACCEPTED claim violates the CHECK constraint; only that proposal stays open
+    assert status == {'h_accept': 'VOTING_OPEN', 'h_reject_1': 'REJECTED', 'h_reject_2': 'REJECTED'}
+    assert logged == {'h_reject_1', 'h_reject_2'}
+    assert (processed, successful) == (3, 2)
@@ -0,0 +1,78 @@
+"""Tests for core.database"""
+import sqlite3
+
+import pytest
+
+import core.database as database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database.Config, 'DATABASE_PATH', str(tmp_path / 'aeon.db'))
+    monkeypatch.setattr(database.Config, 'WAL_CHECKPOINT_INTERVAL', 0)
+    manager = database.DatabaseManager()
+    yield manager
+    manager.close_all()
+
+
+def test_migrates_rowid_ethical_manifest(db):
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("""
+        CREATE TABLE aeon_ethical_manifest (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            version TEXT NOT NULL,
+            principle TEXT NOT NULL,
+            definition TEXT NOT NULL,
+            implementation TEXT,
+            last_updated INTEGER NOT NULL,
+            updated_by TEXT NOT NULL,
+            active INTEGER DEFAULT 1,
+            UNIQUE(version, principle)
+        )
+    """)
+    conn.execute(
+        "INSERT INTO aeon_ethical_manifest "
+        "(version, principle, definition, implementation, last_updated, updated_by, active) "
+        "VALUES ('0.9', 'CUSTOM', 'kept', NULL, 1, 'me', 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    db.initialize_tables()
+    db.initialize_tables()  # second run is a no-op
+
+    conn = sqlite3.connect(db.db_path)
+    sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'aeon_ethical_manifest'"
+    ).fetchone()[0]
+    custom = conn.execute(
+        "SELECT definition, updated_by, active FROM aeon_ethical_manifest WHERE principle = 'CUSTOM'"
+    ).fetchone()
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+
+    assert "WITHOUT ROWID" in sql
+    assert custom == ('kept', 'me', 0)
+    assert 'aeon_ethical_manifest_new' not in tables
+
+
+def test_close_returns_connection_to_pool_once(db):
+    conn = db.get_connection()
+    conn.close()
+    conn.close()  # a second close must not pool it twice
+
+    assert db._pool.qsize() == 1
+    again = db.get_connection()
+    assert again is conn
+    assert again.execute("SELECT 1").fetchone()[0] == 1
+    again.close()
+
+
+def test_acquire_discards_connection_on_error(db):
+    with pytest.raises(RuntimeError):
+        with db.acquire() as conn:
+            raise RuntimeError
+
+    assert db._pool.qsize() == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
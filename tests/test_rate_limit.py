@@ -0,0 +1,74 @@
+"""Tests for middleware.rate_limit"""
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+import middleware.rate_limit as rl
+
+
+@pytest.fixture
+def limiter(tmp_path, monkeypatch):
+    limiter = rl.FileBasedRateLimiter(str(tmp_path))
+    monkeypatch.setattr(rl, '_rate_limiter', limiter)
+    yield limiter
+    limiter.close()
+
+
+def test_window_resets_after_expiry(limiter, monkeypatch):
+    assert rl.check_rate_limit('ip', 1, 60)[0]
+    allowed, limit, remaining, reset_time = rl.check_rate_limit('ip', 1, 60)
+    assert (allowed, limit, remaining) == (False, 1, 0)
+
+    # The UPSERT starts a new window once the stored one has ended
+    monkeypatch.setattr(rl.time, 'time', lambda: reset_time + 1)
+    assert rl.check_rate_limit('ip', 1, 60) == (True, 1, 0, reset_time + 61)
+    assert rl.check_rate_limit_no_increment('ip', 1, 60)[:3] == (False, 1, 0)
+
+
+def test_batch_counts_each_window_separately(limiter):
+    limits = [(10, 3600), (2, 60)]
+    for _ in range(2):
+        allowed, results = rl.check_rate_limit_batch('ip', limits)
+        assert allowed
+
+    allowed, (hour, minute) = rl.check_rate_limit_batch('ip', limits)
+    assert not allowed
+    assert hour[:3] == (True, 10, 7)
+    assert minute[:3] == (False, 2, 0)
+    assert limiter.check('ip_3600', 10, 3600)['count'] == 3
+
+
+def test_client_ip_uses_last_forwarded_entry_only_when_trusted(monkeypatch):
+    app = Flask(__name__)
+    with app.test_request_context(
+        environ_base={'REMOTE_ADDR': '10.0.0.1'},
+        headers={'X-Forwarded-For': '6.6.6.6, 1.2.3.4'}
+    ):
+        monkeypatch.setattr(rl, '_trust_proxy', lambda: False)
+        assert rl.get_client_ip() == '10.0.0.1'
+        monkeypatch.setattr(rl, '_trust_proxy', lambda: True)
+        assert rl.get_client_ip() == '1.2.3.4'
+
+
+def test_decorator_sets_headers(limiter, monkeypatch):
+    monkeypatch.setattr(rl, '_trust_proxy', lambda: False)
+    app = Flask(__name__)
+
+    @app.route('/')
+    @rl.rate_limit_decorator(5, 3600, (1, 60))
+    def index():
+        return jsonify({'status': 'ok'})
+
+    client = app.test_client()
+    ok = client.get('/')
+    limited = client.get('/')
+
+    # Successful responses report the tightest limit, 429s the one exceeded
+    assert ok.status_code == 200
+    assert ok.headers['X-RateLimit-Limit'] == '1'
+    assert ok.headers['X-RateLimit-Remaining'] == '0'
+    assert int(ok.headers['X-RateLimit-Reset']) > time.time()
+    assert limited.status_code == 429
+    assert limited.headers['X-RateLimit-Limit'] == '1'
+    assert limited.get_json()['status'] == 'RATE_LIMITED'